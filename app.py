@@ -1,33 +1,82 @@
-from flask import Flask, send_from_directory
+import hmac
+import mimetypes
+import time
+from flask import Flask, Response, abort, g, make_response, render_template, request, send_from_directory
 from flask_cors import CORS
 from web.api import products_bp, orders_bp
+from web.utils import (asset_url, begin_queries, build_assets, end_queries, is_immutable, metrics,
+                       precompressed, render_prometheus)
 from database import db_manager
 from config import config
 
-app = Flask(__name__, static_folder='web/static', template_folder='web/templates')
+app = Flask(__name__, static_folder=None, template_folder='web/templates')
+metrics.role = 'web'
+app.jinja_env.globals['asset_url'] = asset_url
 CORS(app)
+build_assets()
 
 app.register_blueprint(products_bp, url_prefix='/api')
 app.register_blueprint(orders_bp, url_prefix='/api')
 
 @app.route('/')
 def index():
-    return send_from_directory('web/templates', 'index.html')
+    response = make_response(render_template('index.html'))
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/static/<path:path>')
 def serve_static(path):
-    return send_from_directory('web/static', path)
+    immutable = is_immutable(path)
+    max_age = config.STATIC_MAX_AGE if immutable else None
+
+    encoded = precompressed(path, request.accept_encodings)
+    if encoded:
+        encoding, filename = encoded
+        response = send_from_directory(config.STATIC_PATH, filename, max_age=max_age,
+                                       mimetype=mimetypes.guess_type(path)[0])
+        response.content_encoding = encoding
+    else:
+        response = send_from_directory(config.STATIC_PATH, path, max_age=max_age)
+
+    response.vary.add('Accept-Encoding')
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    # Closed unless a token is configured: behind a reverse proxy every
+    # request looks local, so the client address proves nothing.
+    if not config.METRICS_TOKEN:
+        abort(404)
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(token, config.METRICS_TOKEN):
+        abort(401)
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 @app.before_request
 def before_request():
-    if db_manager.db.is_closed():
-        db_manager.db.connect()
+    g.started = time.perf_counter()
+    g.query_stats, g.query_stats_token = begin_queries()
+    if request.endpoint in ('index', 'serve_static', 'prometheus_metrics'):
+        return
+    db_manager.db.connect(reuse_if_open=True)
 
 @app.teardown_request
 def teardown_request(exception=None):
     if not db_manager.db.is_closed():
         db_manager.db.close()
 
+    if 'started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_seconds', time.perf_counter() - g.started,
+                        route=route, method=request.method)
+        metrics.observe('http_request_db_queries', g.query_stats.queries, route=route)
+        metrics.observe('http_request_db_seconds', g.query_stats.seconds, route=route)
+        end_queries(g.query_stats_token)
+        metrics.maybe_flush()
+
 if __name__ == '__main__':
     try:
         config.validate()
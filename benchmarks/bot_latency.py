@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+import gc
+import itertools
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Document, File, Message, Update, User as TelegramUser
+
+from config import config
+from database import db_manager
+from web.models import User
+from web.utils import import_products
+
+IMPORT_ROWS = 50000
+REQUESTS = 300
+INTERVAL = 0.01
+ADMIN_ID = 1
+
+class FakeSession(BaseSession):
+    def __init__(self, content: bytes):
+        super().__init__()
+        self.content = content
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        if type(method).__name__ == 'GetFile':
+            return File(file_id='import', file_unique_id='import', file_path='documents/import.xlsx')
+        if type(method).__name__ in ('SendMessage', 'EditMessageText'):
+            return Message(
+                message_id=1, date=datetime.datetime.now(),
+                chat=Chat(id=1, type='private'), text=''
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield self.content
+
+_ids = itertools.count(1)
+
+def make_update(user_id, **fields):
+    return Update(update_id=next(_ids), message=Message(
+        message_id=next(_ids), date=datetime.datetime.now(),
+        chat=Chat(id=user_id, type='private'),
+        from_user=TelegramUser(id=user_id, is_bot=False, first_name='Bench'),
+        **fields
+    ))
+
+def make_dispatcher():
+    from bot.handlers import admin, commands, user_orders
+    from bot.middlewares import AdminRoleMiddleware, HandlerTimingMiddleware
+
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.update.outer_middleware(AdminRoleMiddleware())
+    dp.message.middleware(HandlerTimingMiddleware())
+    dp.include_router(admin.router)
+    dp.include_router(user_orders.router)
+    dp.include_router(commands.router)
+    return dp
+
+def write_catalog(path):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for i in range(IMPORT_ROWS):
+        ws.append([f'Товар {i}', f'Описание {i}', 100 + i % 1000])
+    wb.save(path)
+
+async def start_load(dp, bot):
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    latencies = []
+
+    async def one(i):
+        scheduled = t0 + i * INTERVAL
+        await asyncio.sleep(max(0, scheduled - loop.time()))
+        await dp.feed_update(bot, make_update(1000 + i, text='/start'))
+        latencies.append((loop.time() - scheduled) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    latencies.sort()
+    return latencies
+
+def report(name, latencies):
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<28} {p50:>8.2f}ms {p99:>8.2f}ms {latencies[-1]:>8.2f}ms")
+
+async def run(catalog_path):
+    bot = Bot(token='42:BENCH', session=FakeSession(catalog_path.read_bytes()))
+    dp = make_dispatcher()
+    gc.freeze()
+
+    print(f"{'/start under':<28} {'p50':>10} {'p99':>10} {'max':>10}")
+    report('no import', await start_load(dp, bot))
+
+    await dp.feed_update(bot, make_update(ADMIN_ID, text='/admin'))
+    from bot.states.admin import ImportProducts
+    await dp.fsm.get_context(bot, ADMIN_ID, ADMIN_ID).set_state(ImportProducts.waiting_file)
+    importing = asyncio.create_task(dp.feed_update(bot, make_update(
+        ADMIN_ID, document=Document(file_id='import', file_unique_id='import', file_name='catalog.xlsx')
+    )))
+    report('import in worker thread', await start_load(dp, bot))
+    await importing
+
+    async def import_on_loop():
+        await asyncio.sleep(0)
+        import_products(catalog_path)
+
+    importing = asyncio.create_task(import_on_loop())
+    report('import on event loop', await start_load(dp, bot))
+    await importing
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_PATH = Path(tmp) / 'bench.db'
+        config.CATALOG_VERSION_PATH = Path(tmp) / 'catalog.version'
+        db_manager.initialize()
+        db_manager.create_tables()
+        User.create(telegram_id=ADMIN_ID, is_admin=True)
+
+        catalog_path = Path(tmp) / 'catalog.xlsx'
+        write_catalog(catalog_path)
+        asyncio.run(run(catalog_path))
+
+        db_manager.close()
+
+if __name__ == '__main__':
+    main()
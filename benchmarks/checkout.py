@@ -0,0 +1,74 @@
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import config
+from database import db_manager
+from web.models import Order, OrderItem, Product
+from web.utils import place_order
+
+CART_SIZES = [1, 5, 20]
+ITERATIONS = 200
+
+def legacy_checkout(cart_items):
+    total_amount = 0
+    order_items_data = []
+    for item in cart_items:
+        product = Product.get_by_id(item['product_id'])
+        quantity = item['quantity']
+        total_amount += float(product.price) * quantity
+        order_items_data.append({
+            'product': product,
+            'product_name': product.name,
+            'quantity': quantity,
+            'price': product.price
+        })
+
+    order = Order.create(
+        first_name='Bench', last_name='Mark', phone='+70000000000',
+        total_amount=total_amount, comment=''
+    )
+    for item_data in order_items_data:
+        OrderItem.create(order=order, **item_data)
+    return order
+
+def batched_checkout(cart_items):
+    order, _ = place_order('Bench', 'Mark', '+70000000000', '', '', cart_items)
+    return order
+
+def measure(func, cart_items):
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        func(cart_items)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.mean(timings), timings[int(len(timings) * 0.95) - 1]
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_PATH = Path(tmp) / 'bench.db'
+        db_manager.initialize()
+        db_manager.create_tables()
+        Product.insert_many([
+            {'name': f'Товар {i}', 'description': '', 'price': 100 + i}
+            for i in range(max(CART_SIZES))
+        ]).execute()
+        product_ids = [p.id for p in Product.select(Product.id)]
+
+        print(f"{'cart':>6} {'legacy mean':>12} {'legacy p95':>11} {'batched mean':>13} {'batched p95':>12} {'speedup':>8}")
+        for size in CART_SIZES:
+            cart_items = [{'product_id': pid, 'quantity': 2} for pid in product_ids[:size]]
+            legacy_mean, legacy_p95 = measure(legacy_checkout, cart_items)
+            batched_mean, batched_p95 = measure(batched_checkout, cart_items)
+            print(f"{size:>6} {legacy_mean:>10.2f}ms {legacy_p95:>9.2f}ms "
+                  f"{batched_mean:>11.2f}ms {batched_p95:>10.2f}ms {legacy_mean / batched_mean:>7.1f}x")
+
+        db_manager.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+import asyncio
+import datetime
+import itertools
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User as TelegramUser
+
+from config import config
+from database import db_manager
+from web.models import Order, OrderItem, Product, User
+
+PRODUCTS = 200
+ORDERS = 30
+CALLS = 5000
+UPDATES = 2000
+BUYER_ID = 500
+
+class FakeSession(BaseSession):
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        if type(method).__name__ in ('SendMessage', 'EditMessageText'):
+            return Message(
+                message_id=1, date=datetime.datetime.now(),
+                chat=Chat(id=BUYER_ID, type='private'), text=''
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b''
+
+_ids = itertools.count(1)
+
+def message_update(text):
+    return Update(update_id=next(_ids), message=Message(
+        message_id=next(_ids), date=datetime.datetime.now(),
+        chat=Chat(id=BUYER_ID, type='private'),
+        from_user=TelegramUser(id=BUYER_ID, is_bot=False, first_name='Bench', username='bench'),
+        text=text
+    ))
+
+def callback_update(data):
+    user = TelegramUser(id=BUYER_ID, is_bot=False, first_name='Bench', username='bench')
+    return Update(update_id=next(_ids), callback_query=CallbackQuery(
+        id=str(next(_ids)), from_user=user, chat_instance='bench', data=data,
+        message=Message(
+            message_id=next(_ids), date=datetime.datetime.now(),
+            chat=Chat(id=BUYER_ID, type='private'), from_user=user, text='bench'
+        )
+    ))
+
+def seed():
+    Product.insert_many([
+        {'name': f'Товар {i}', 'description': f'Описание {i}', 'price': Decimal(100 + i)}
+        for i in range(PRODUCTS)
+    ]).execute()
+    buyer = User.create(telegram_id=BUYER_ID, username='bench')
+    for i in range(ORDERS):
+        order = Order.create(
+            user=buyer, first_name='Bench', last_name='User', phone='+70000000000',
+            username='bench', total_amount=Decimal('300.00'), comment='Позвонить заранее'
+        )
+        OrderItem.insert_many([
+            {'order': order, 'product': 1 + (i + k) % PRODUCTS, 'product_name': f'Товар {k}',
+             'quantity': 1 + k, 'price': Decimal(100)}
+            for k in range(3)
+        ]).execute()
+
+def clear_caches():
+    from bot.keyboards import catalog_renders, order_renders
+    from bot.keyboards import main as keyboards
+
+    catalog_renders.invalidate()
+    order_renders.invalidate()
+    for name in ('get_main_keyboard', 'get_admin_keyboard', 'get_cancel_keyboard',
+                 'get_product_actions_keyboard'):
+        getattr(keyboards, name).cache_clear()
+
+def per_call(func, *args):
+    started = time.perf_counter()
+    for _ in range(CALLS):
+        func(*args)
+    return (time.perf_counter() - started) / CALLS * 1e6
+
+def builders():
+    from bot.handlers.admin import build_products_keyboard, products_keyboard
+    from bot.handlers.user_orders import (build_user_orders_keyboard, user_orders_keyboard,
+                                          user_orders_page)
+    from bot.keyboards import get_main_keyboard, get_product_actions_keyboard
+    from bot.utils import paginate
+
+    products_page = paginate(Product.select().where(Product.is_active == True), Product.id)
+    orders_page = user_orders_page(BUYER_ID)
+    cases = [
+        ('main keyboard', get_main_keyboard.__wrapped__, get_main_keyboard, ()),
+        ('product actions', get_product_actions_keyboard.__wrapped__, get_product_actions_keyboard, (7,)),
+        ('products page', build_products_keyboard, products_keyboard, (products_page,)),
+        ('orders page', build_user_orders_keyboard, user_orders_keyboard, (orders_page,)),
+    ]
+    print(f"{'builder':<20} {'uncached':>12} {'cached':>12}")
+    for name, build, cached, args in cases:
+        print(f"{name:<20} {per_call(build, *args):>10.1f}us {per_call(cached, *args):>10.1f}us")
+
+async def dispatch(dp, bot, cold):
+    order_ids = [order_id for order_id, in Order.select(Order.id).tuples()]
+    updates = []
+    for i in range(UPDATES):
+        kind = i % 4
+        if kind == 0:
+            updates.append(message_update('/start'))
+        elif kind == 1:
+            updates.append(message_update('📦 Мои заказы'))
+        elif kind == 2:
+            updates.append(callback_update(f'user_order_{order_ids[i % len(order_ids)]}'))
+        else:
+            updates.append(callback_update('back_to_user_orders'))
+
+    cpu = 0.0
+    for update in updates:
+        if cold:
+            clear_caches()
+        started = time.process_time()
+        await dp.feed_update(bot, update)
+        cpu += time.process_time() - started
+    return cpu / UPDATES * 1e6
+
+async def run():
+    from bot.handlers import commands, user_orders
+    from bot.middlewares import AdminRoleMiddleware
+
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.update.outer_middleware(AdminRoleMiddleware())
+    dp.include_router(user_orders.router)
+    dp.include_router(commands.router)
+    bot = Bot(token='42:BENCH', session=FakeSession())
+
+    print(f"{'per update CPU':<20} {'cold':>12} {'warm':>12}")
+    cold = await dispatch(dp, bot, cold=True)
+    warm = await dispatch(dp, bot, cold=False)
+    print(f"{'mixed buyer screens':<20} {cold:>10.1f}us {warm:>10.1f}us")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_PATH = Path(tmp) / 'bench.db'
+        config.CATALOG_VERSION_PATH = Path(tmp) / 'catalog.version'
+        db_manager.initialize()
+        db_manager.create_tables()
+        seed()
+
+        builders()
+        print()
+        asyncio.run(run())
+
+        db_manager.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+WORKER_COUNTS = [1, 2, 4]
+CLIENTS = 16
+DURATION = 5
+PRODUCTS = 50
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def seed(env):
+    code = (
+        "from database import db_manager\n"
+        "from web.models import Product\n"
+        "db_manager.initialize(); db_manager.create_tables()\n"
+        f"Product.insert_many([{{'name': f'Товар {{i}}', 'description': '', 'price': 100 + i}} for i in range({PRODUCTS})]).execute()\n"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True)
+
+def start_server(env, port, workers):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(workers),
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        cwd=ROOT, env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/products')
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start')
+
+def client(args):
+    port, scenario, duration = args
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    body = json.dumps({
+        'first_name': 'Bench', 'last_name': 'Mark', 'phone': '+70000000000',
+        'cart': [{'product_id': i, 'quantity': 1} for i in range(1, 6)]
+    })
+    done = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        if scenario == 'catalog':
+            conn.request('GET', '/api/products')
+            expected = 200
+        else:
+            conn.request('POST', '/api/checkout', body=body, headers={'Content-Type': 'application/json'})
+            expected = 201
+        response = conn.getresponse()
+        response.read()
+        if response.status == expected:
+            done += 1
+        else:
+            errors += 1
+    return done, errors
+
+def run_scenario(port, scenario):
+    with multiprocessing.Pool(CLIENTS) as pool:
+        results = pool.map(client, [(port, scenario, DURATION)] * CLIENTS)
+    done = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return done / DURATION, errors
+
+def main():
+    print(f"{'workers':>8} {'catalog rps':>12} {'checkout rps':>13} {'errors':>7}")
+    for workers in WORKER_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                BOT_TOKEN='42:BENCH',
+                DATABASE_PATH=str(Path(tmp) / 'bench.db'),
+                CATALOG_VERSION_PATH=str(Path(tmp) / 'catalog.version'),
+                SSL_CERT_PATH=str(Path(tmp) / 'cert.pem'),
+                SSL_KEY_PATH=str(Path(tmp) / 'key.pem'),
+            )
+            seed(env)
+            port = free_port()
+            server = start_server(env, port, workers)
+            try:
+                catalog_rps, catalog_errors = run_scenario(port, 'catalog')
+                checkout_rps, checkout_errors = run_scenario(port, 'checkout')
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"{workers:>8} {catalog_rps:>12.0f} {checkout_rps:>13.0f} {catalog_errors + checkout_errors:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+import json
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Message
+
+from config import config
+from database import db_manager
+
+UPDATES = 2000
+CLIENTS = 40
+API_LATENCY = 0.05
+SECRET = 'replay-secret'
+
+class FakeSession(BaseSession):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        await asyncio.sleep(API_LATENCY)
+        self.calls += 1
+        if type(method).__name__ in ('SendMessage', 'EditMessageText'):
+            return Message(
+                message_id=1, date=datetime.datetime.now(),
+                chat=Chat(id=1, type='private'), text=''
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b''
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def load_updates(path):
+    if path:
+        return [json.loads(line) for line in Path(path).read_text(encoding='utf-8').splitlines() if line.strip()]
+    now = int(time.time())
+    return [{
+        'update_id': i,
+        'message': {
+            'message_id': i, 'date': now, 'text': '/start',
+            'chat': {'id': 1000 + i, 'type': 'private'},
+            'from': {'id': 1000 + i, 'is_bot': False, 'first_name': 'Replay'}
+        }
+    } for i in range(1, UPDATES + 1)]
+
+async def post_all(url, updates):
+    latencies = []
+    queue = asyncio.Queue()
+    for update in updates:
+        queue.put_nowait(update)
+
+    async def client(session):
+        while not queue.empty():
+            update = queue.get_nowait()
+            started = time.perf_counter()
+            async with session.post(url, json=update, headers={'X-Telegram-Bot-Api-Secret-Token': SECRET}) as response:
+                assert response.status == 200, response.status
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=updates[0], headers={'X-Telegram-Bot-Api-Secret-Token': 'wrong'}) as response:
+            print(f"wrong secret -> {response.status}")
+        await asyncio.gather(*(client(session) for _ in range(CLIENTS)))
+    latencies.sort()
+    return latencies
+
+async def run(updates):
+    from main import create_dispatcher, create_webhook_app
+
+    session = FakeSession()
+    bot = Bot(token='42:REPLAY', session=session)
+    dp = create_dispatcher(MemoryStorage())
+    runner = web.AppRunner(create_webhook_app(dp, bot))
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+
+    started = time.perf_counter()
+    latencies = await post_all(f'http://127.0.0.1:{port}{config.WEBHOOK_PATH}', updates)
+    acked = time.perf_counter() - started
+    await runner.cleanup()
+    drained = time.perf_counter() - started
+
+    print(f"updates posted      {len(updates)}")
+    print(f"API calls made      {session.calls}")
+    print(f"ack p50 / p99       {latencies[len(latencies) // 2]:.1f}ms / {latencies[int(len(latencies) * 0.99) - 1]:.1f}ms")
+    print(f"all acked in        {acked:.2f}s ({len(updates) / acked:.0f} updates/s)")
+    print(f"drained in          {drained:.2f}s")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_PATH = Path(tmp) / 'replay.db'
+        config.CATALOG_VERSION_PATH = Path(tmp) / 'catalog.version'
+        config.WEBHOOK_SECRET = SECRET
+        db_manager.initialize()
+        db_manager.create_tables()
+        asyncio.run(run(load_updates(sys.argv[1] if len(sys.argv) > 1 else None)))
+        db_manager.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,2 @@
-from . import commands, admin, user_orders
-__all__ = ['commands', 'admin', 'user_orders']
+from . import commands, admin, inline, user_orders
+__all__ = ['commands', 'admin', 'inline', 'user_orders']
@@ -2,30 +2,62 @@ from aiogram import Router, F
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, FSInputFile, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
-from bot.states.admin import AdminAuth, AddProduct, EditProduct, ImportProducts
+from bot.states.admin import AdminAuth, AddProduct, EditProduct, ImportProducts, SearchProducts
 from bot.keyboards import (get_admin_keyboard, get_cancel_keyboard, get_main_keyboard,
                            get_add_product_choice, get_skip_photo_keyboard,
-                           get_back_keyboard, get_product_actions_keyboard)
-from bot.utils import create_pagination_keyboard
-from web.models import User, Product, Order, OrderItem
+                           get_product_actions_keyboard, catalog_renders, page_key)
+from bot.middlewares import admin_cache
+from bot.utils import blocking, create_pagination_keyboard, paginate, parse_page_callback, run_blocking
+from web.models import User, Product, Order
+from web.utils import (ImportProgress, get_client_summary, get_excel_file, get_order_details,
+                       import_products, invalidate_catalog, metrics, release_photo, search_products,
+                       store_photo, summarize)
+from web.utils.stats import get_sales_stats
 from config import config
 from pathlib import Path
-import openpyxl
+import asyncio
 
 router = Router()
 
-def is_admin(user_id: int) -> bool:
-    try:
-        user = User.get(User.telegram_id == user_id)
-        return user.is_admin
-    except User.DoesNotExist:
-        return False
+@blocking
+def grant_admin(user_id):
+    user, created = User.get_or_create(
+        telegram_id=user_id,
+        defaults={'is_admin': True}
+    )
+    if not created:
+        user.is_admin = True
+        user.save()
+
+@blocking
+def create_product(**fields):
+    Product.create(**fields)
+    invalidate_catalog()
+
+@blocking
+def update_product(product_id, **fields):
+    Product.update(**fields).where(Product.id == product_id).execute()
+    invalidate_catalog()
+
+@blocking
+def set_product_photo(product_id, data):
+    product = Product.get_by_id(product_id)
+    photo_path = store_photo(data)
+    Product.update(photo_path=photo_path).where(Product.id == product_id).execute()
+    if product.photo_path != photo_path:
+        release_photo(product.photo_path)
+    invalidate_catalog()
+
+@blocking
+def remove_product(product_id):
+    product = Product.get_by_id(product_id)
+    product.delete_instance()
+    release_photo(product.photo_path)
+    invalidate_catalog()
 
 @router.message(Command('admin'))
-async def cmd_admin(message: Message, state: FSMContext):
-    user_id = message.from_user.id
-    
-    if is_admin(user_id):
+async def cmd_admin(message: Message, state: FSMContext, is_admin: bool):
+    if is_admin:
         await message.answer(
             "🔐 Админ-панель",
             reply_markup=get_admin_keyboard()
@@ -46,13 +78,8 @@ async def cancel_auth(message: Message, state: FSMContext):
 async def check_password(message: Message, state: FSMContext):
     if message.text == config.ADMIN_PASSWORD:
         user_id = message.from_user.id
-        user, created = User.get_or_create(
-            telegram_id=user_id,
-            defaults={'is_admin': True}
-        )
-        if not created:
-            user.is_admin = True
-            user.save()
+        await grant_admin(user_id)
+        admin_cache.set(user_id, True)
         
         await state.clear()
         await message.answer(
@@ -70,8 +97,8 @@ async def logout_menu(message: Message):
     await message.answer("👋 Возврат в главное меню", reply_markup=get_main_keyboard())
 
 @router.message(F.text == '➕ Добавить товар')
-async def add_product_start(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
+async def add_product_start(message: Message, state: FSMContext, is_admin: bool):
+    if not is_admin:
         return
     await message.answer(
         "Выберите способ добавления:",
@@ -91,7 +118,7 @@ async def add_manual(callback: CallbackQuery, state: FSMContext):
 async def add_import(callback: CallbackQuery, state: FSMContext):
     await callback.message.delete()
     template_text = (
-        "📁 Отправьте Excel файл для импорта\n\n"
+        "📁 Отправьте Excel (.xlsx) или CSV файл для импорта\n\n"
         "📋 Формат файла:\n"
         "• Колонка A: Название\n"
         "• Колонка B: Описание\n"
@@ -100,6 +127,7 @@ async def add_import(callback: CallbackQuery, state: FSMContext):
         f"• Название: до {config.MAX_NAME_LENGTH} символов\n"
         f"• Описание: до {config.MAX_DESCRIPTION_LENGTH} символов\n"
         f"• Цена: от {config.MIN_PRICE} до {config.MAX_PRICE} ₽\n\n"
+        "ℹ️ Товары с уже существующим названием обновляются\n"
         "ℹ️ Фото можно добавить через редактирование"
     )
     await callback.message.answer(template_text, reply_markup=get_cancel_keyboard())
@@ -112,66 +140,53 @@ async def cancel_import(message: Message, state: FSMContext):
 
 @router.message(ImportProducts.waiting_file, F.document)
 async def import_excel(message: Message, state: FSMContext):
+    suffix = Path(message.document.file_name or '').suffix.lower()
+    if suffix not in ('.xlsx', '.csv'):
+        await message.answer("❌ Поддерживаются только файлы .xlsx и .csv")
+        return
+
+    await state.clear()
+    import tempfile
+    temp_dir = Path(tempfile.gettempdir())
+    filepath = temp_dir / f"{message.document.file_unique_id}{suffix}"
+
     try:
-        file = await message.bot.get_file(message.document.file_id)
-        import tempfile
-        temp_dir = Path(tempfile.gettempdir())
-        filepath = temp_dir / f"{message.document.file_id}.xlsx"
-        await message.bot.download_file(file.file_path, filepath)
-        
-        wb = openpyxl.load_workbook(filepath)
-        ws = wb.active
-        
-        added = 0
-        skipped = []
-        
-        for idx, row in enumerate(ws.iter_rows(min_row=1, values_only=True), start=1):
-            if not row[0]:
-                continue
-
-            if len(row) < 3:
-                skipped.append(f"Строка {idx}: недостаточно колонок")
-                continue
-
-            name = str(row[0]).strip()
-            description = str(row[1]).strip() if row[1] else ''
-            try:
-                price = float(row[2])
-            except:
-                skipped.append(f"Строка {idx}: неверная цена")
-                continue
-            
-            if len(name) > config.MAX_NAME_LENGTH:
-                skipped.append(f"Строка {idx}: название слишком длинное")
-                continue
-            if len(description) > config.MAX_DESCRIPTION_LENGTH:
-                skipped.append(f"Строка {idx}: описание слишком длинное")
-                continue
-            if price < config.MIN_PRICE or price > config.MAX_PRICE:
-                skipped.append(f"Строка {idx}: цена вне диапазона")
-                continue
-            
-            Product.create(name=name, description=description, price=price)
-            added += 1
-        
-        filepath.unlink()
-        
-        result = f"✅ Импортировано: {added} товар(ов)\n"
-        if skipped:
-            result += f"\n⚠️ Пропущено {len(skipped)} строк:\n"
-            result += '\n'.join(skipped[:5])
-            if len(skipped) > 5:
-                result += f"\n... и ещё {len(skipped)-5}"
-        
-        await message.answer(result, reply_markup=get_admin_keyboard())
-        await state.clear()
-        
+        await message.bot.download(message.document, destination=filepath)
+        status = await message.answer("⏳ Импорт начат...")
+
+        progress = ImportProgress()
+        task = asyncio.create_task(run_blocking(import_products, filepath, progress))
+        reported = 0
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=config.IMPORT_PROGRESS_INTERVAL)
+            if done:
+                break
+            current = progress.snapshot()
+            if current.processed != reported:
+                reported = current.processed
+                await status.edit_text(f"⏳ Обработано строк: {current.processed}")
+        result = task.result()
+
+        text = (
+            f"✅ Импортировано: {result.added} товар(ов)\n"
+            f"🔄 Обновлено: {result.updated} товар(ов)\n"
+        )
+        if result.skipped:
+            text += f"\n⚠️ Пропущено {result.skipped} строк:\n"
+            text += '\n'.join(result.errors)
+            if result.skipped > len(result.errors):
+                text += f"\n... и ещё {result.skipped - len(result.errors)}"
+
+        await status.delete()
+        await message.answer(text, reply_markup=get_admin_keyboard())
+
     except Exception as e:
         await message.answer(
             f"❌ Ошибка импорта: {str(e)}",
             reply_markup=get_admin_keyboard()
         )
-        await state.clear()
+    finally:
+        await run_blocking(filepath.unlink, missing_ok=True)
 
 @router.message(AddProduct.name, F.text == '❌ Отмена')
 async def cancel_add(message: Message, state: FSMContext):
@@ -243,7 +258,7 @@ async def add_price(message: Message, state: FSMContext):
 @router.callback_query(AddProduct.photo, F.data == 'skip_photo')
 async def skip_photo(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    Product.create(
+    await create_product(
         name=data['name'],
         description=data['description'],
         price=data['price'],
@@ -259,15 +274,10 @@ async def skip_photo(callback: CallbackQuery, state: FSMContext):
 @router.message(AddProduct.photo, F.photo)
 async def add_with_photo(message: Message, state: FSMContext):
     data = await state.get_data()
-    photo = message.photo[-1]
-    file_info = await message.bot.get_file(photo.file_id)
-    filename = f"{data['name'].replace(' ', '_')}_{photo.file_id}.jpg"
-    filepath = config.PHOTOS_PATH / filename
-    
-    await message.bot.download_file(file_info.file_path, filepath)
-    photo_url = f"/static/assets/photos/{filename}"
+    photo = await message.bot.download(message.photo[-1])
+    photo_url = await run_blocking(store_photo, photo.getvalue())
     
-    Product.create(
+    await create_product(
         name=data['name'],
         description=data['description'],
         price=data['price'],
@@ -279,47 +289,78 @@ async def add_with_photo(message: Message, state: FSMContext):
     )
     await state.clear()
 
+def build_products_keyboard(page):
+    keyboard = create_pagination_keyboard(
+        page=page,
+        callback_prefix='products',
+        get_button_text=lambda p: f"{p.name} — {float(p.price):.2f} ₽",
+        get_button_data=lambda p: f"product_{p.id}"
+    )
+    keyboard.inline_keyboard.append([InlineKeyboardButton(text='🔍 Поиск', callback_data='search_products')])
+    return keyboard
+
+def products_keyboard(page):
+    return catalog_renders.render(page_key('products', page), lambda: build_products_keyboard(page))
+
 @router.message(F.text == '✏️ Редактировать товары')
-async def edit_products_list(message: Message):
-    if not is_admin(message.from_user.id):
+async def edit_products_list(message: Message, is_admin: bool):
+    if not is_admin:
         return
     
-    products = list(Product.select().where(Product.is_active == True))
-    if not products:
+    page = await run_blocking(paginate, Product.select().where(Product.is_active == True), Product.id)
+    if not page.items:
         await message.answer("❌ Нет товаров", reply_markup=get_admin_keyboard())
         return
     
-    keyboard = create_pagination_keyboard(
-        items=products,
-        page=0,
-        per_page=10,
-        callback_prefix='products',
-        get_button_text=lambda p: f"{p.name} — {float(p.price):.2f} ₽",
-        get_button_data=lambda p: f"product_{p.id}"
-    )
+    keyboard = products_keyboard(page)
     
     await message.answer("📦 Выберите товар:", reply_markup=keyboard)
 
 @router.callback_query(F.data.startswith('products_page_'))
 async def products_pagination(callback: CallbackQuery):
-    page = int(callback.data.split('_')[-1])
-    products = list(Product.select().where(Product.is_active == True))
+    cursor = parse_page_callback(callback.data, 'products')
+    page = await run_blocking(paginate, Product.select().where(Product.is_active == True), Product.id, cursor)
     
-    keyboard = create_pagination_keyboard(
-        items=products,
-        page=page,
-        per_page=10,
-        callback_prefix='products',
-        get_button_text=lambda p: f"{p.name} — {float(p.price):.2f} ₽",
-        get_button_data=lambda p: f"product_{p.id}"
-    )
+    keyboard = products_keyboard(page)
     
     await callback.message.edit_reply_markup(reply_markup=keyboard)
 
+@router.callback_query(F.data == 'search_products')
+async def search_products_start(callback: CallbackQuery, state: FSMContext):
+    await callback.message.answer(
+        "🔍 Введите название или слова из описания:",
+        reply_markup=get_cancel_keyboard()
+    )
+    await state.set_state(SearchProducts.waiting_query)
+    await callback.answer()
+
+@router.message(SearchProducts.waiting_query, F.text == '❌ Отмена')
+async def cancel_search(message: Message, state: FSMContext):
+    await state.clear()
+    await message.answer("❌ Отменено", reply_markup=get_admin_keyboard())
+
+@router.message(SearchProducts.waiting_query, F.text)
+async def search_products_results(message: Message, state: FSMContext):
+    products = await run_blocking(search_products, message.text)
+    await state.clear()
+    
+    if not products:
+        await message.answer("❌ Ничего не найдено", reply_markup=get_admin_keyboard())
+        return
+    
+    keyboard = [
+        [InlineKeyboardButton(text=f"{p.name} — {float(p.price):.2f} ₽", callback_data=f"product_{p.id}")]
+        for p in products
+    ]
+    keyboard.append([InlineKeyboardButton(text='🔍 Искать ещё', callback_data='search_products')])
+    
+    await message.answer(f"🔍 Найдено: {len(products)}", reply_markup=get_admin_keyboard())
+    await message.answer("📦 Выберите товар:", reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard))
+
 @router.callback_query(F.data.startswith('product_'))
 async def show_product(callback: CallbackQuery):
     product_id = int(callback.data.split('_')[1])
-    product = Product.get_by_id(product_id)
+    product = await run_blocking(Product.get_by_id, product_id)
     
     text = f"📦 {product.name}\n\n"
     text += f"📝 {product.description}\n\n"
@@ -340,9 +381,8 @@ async def show_product(callback: CallbackQuery):
             )
         else:
             await callback.message.answer(
-                 text + f"\n\n⚠️ Фото не найдено: {file_path}",
-                reply_markup=markup,
-                parse_mode='HTML'
+                text + f"\n\n⚠️ Фото не найдено: {file_path}",
+                reply_markup=get_product_actions_keyboard(product_id)
             )
     else:
         await callback.message.answer(
@@ -352,15 +392,8 @@ async def show_product(callback: CallbackQuery):
 
 @router.callback_query(F.data == 'back_to_products')
 async def back_to_products(callback: CallbackQuery):
-    products = list(Product.select().where(Product.is_active == True))
-    keyboard = create_pagination_keyboard(
-        items=products,
-        page=0,
-        per_page=10,
-        callback_prefix='products',
-        get_button_text=lambda p: f"{p.name} — {float(p.price):.2f} ₽",
-        get_button_data=lambda p: f"product_{p.id}"
-    )
+    page = await run_blocking(paginate, Product.select().where(Product.is_active == True), Product.id)
+    keyboard = products_keyboard(page)
     
     await callback.message.delete()
     await callback.message.answer("📦 Выберите товар:", reply_markup=keyboard)
@@ -390,9 +423,7 @@ async def save_name(message: Message, state: FSMContext):
         return
     
     data = await state.get_data()
-    product = Product.get_by_id(data['product_id'])
-    product.name = message.text
-    product.save()
+    await update_product(data['product_id'], name=message.text)
     
     await message.answer("✅ Название изменено!", reply_markup=get_admin_keyboard())
     await state.clear()
@@ -422,9 +453,7 @@ async def save_desc(message: Message, state: FSMContext):
         return
     
     data = await state.get_data()
-    product = Product.get_by_id(data['product_id'])
-    product.description = message.text
-    product.save()
+    await update_product(data['product_id'], description=message.text)
     
     await message.answer("✅ Описание изменено!", reply_markup=get_admin_keyboard())
     await state.clear()
@@ -456,9 +485,7 @@ async def save_price(message: Message, state: FSMContext):
             return
         
         data = await state.get_data()
-        product = Product.get_by_id(data['product_id'])
-        product.price = price
-        product.save()
+        await update_product(data['product_id'], price=price)
         
         await message.answer("✅ Цена изменена!", reply_markup=get_admin_keyboard())
         await state.clear()
@@ -483,21 +510,8 @@ async def cancel_edit_photo(message: Message, state: FSMContext):
 @router.message(EditProduct.edit_photo, F.photo)
 async def save_photo(message: Message, state: FSMContext):
     data = await state.get_data()
-    product = Product.get_by_id(data['product_id'])
-    
-    if product.photo_path:
-        old_path = config.PHOTOS_PATH / Path(product.photo_path).name
-        if old_path.exists():
-            old_path.unlink()
-    
-    photo = message.photo[-1]
-    file_info = await message.bot.get_file(photo.file_id)
-    filename = f"{product.name.replace(' ', '_')}_{photo.file_id}.jpg"
-    filepath = config.PHOTOS_PATH / filename
-    
-    await message.bot.download_file(file_info.file_path, filepath)
-    product.photo_path = f"/static/assets/photos/{filename}"
-    product.save()
+    photo = await message.bot.download(message.photo[-1])
+    await set_product_photo(data['product_id'], photo.getvalue())
     
     await message.answer("✅ Фото изменено!", reply_markup=get_admin_keyboard())
     await state.clear()
@@ -505,14 +519,7 @@ async def save_photo(message: Message, state: FSMContext):
 @router.callback_query(F.data.startswith('delete_'))
 async def delete_product(callback: CallbackQuery):
     product_id = int(callback.data.split('_')[1])
-    product = Product.get_by_id(product_id)
-    
-    if product.photo_path:
-        photo_path = config.PHOTOS_PATH / Path(product.photo_path).name
-        if photo_path.exists():
-            photo_path.unlink()
-    
-    product.delete_instance()
+    await remove_product(product_id)
     await callback.message.delete()
     await callback.message.answer(
         f"✅ Товар удалён",
@@ -520,58 +527,106 @@ async def delete_product(callback: CallbackQuery):
     )
 
 @router.message(F.text == '📊 Статистика')
-async def show_stats(message: Message):
-    if not is_admin(message.from_user.id):
+async def show_stats(message: Message, is_admin: bool):
+    if not is_admin:
         return
     
-    total_products = Product.select().where(Product.is_active == True).count()
-    total_orders = Order.select().count()
-    total_revenue = sum([float(o.total_amount) for o in Order.select()])
+    stats = await run_blocking(get_sales_stats)
     
-    await message.answer(
+    text = (
         f"📊 Статистика:\n\n"
-        f"📦 Товаров: {total_products}\n"
-        f"🛒 Заказов: {total_orders}\n"
-        f"💰 Выручка: {total_revenue:.2f} ₽",
-        reply_markup=get_admin_keyboard()
+        f"📦 Товаров: {stats['products']}\n"
+        f"🛒 Заказов: {stats['orders']}\n"
+        f"💰 Выручка: {stats['revenue']:.2f} ₽\n"
     )
+    
+    if stats['by_day']:
+        text += "\n📅 По дням:\n"
+        for day, orders_count, revenue in stats['by_day']:
+            text += f"  {day.strftime('%d.%m')} — {orders_count} зак., {float(revenue):.2f} ₽\n"
+    
+    if stats['by_week']:
+        text += "\n🗓 По неделям:\n"
+        for week_start, orders_count, revenue in stats['by_week']:
+            text += f"  с {week_start.strftime('%d.%m')} — {orders_count} зак., {float(revenue):.2f} ₽\n"
+    
+    if stats['by_product']:
+        text += "\n🏆 Топ товаров:\n"
+        for product_name, quantity, revenue in stats['by_product']:
+            text += f"  • {product_name} — {quantity} шт, {float(revenue):.2f} ₽\n"
+    
+    await message.answer(text, reply_markup=get_admin_keyboard())
+
+METRICS_TOP = 8
+
+def format_timings(title, timings, queries=None):
+    if not timings:
+        return ""
+    text = f"\n{title}\n"
+    ranked = sorted(timings.items(), key=lambda item: item[1].total, reverse=True)[:METRICS_TOP]
+    for name, histogram in ranked:
+        text += (f"  • {name.rsplit('.', 1)[-1]} — {histogram.count} раз, "
+                 f"ср. {histogram.total / histogram.count * 1000:.1f} мс, "
+                 f"p95 ≤ {histogram.quantile(0.95) * 1000:.1f} мс")
+        if queries and name in queries:
+            text += f", SQL {queries[name].total / queries[name].count:.1f}"
+        text += "\n"
+    return text
+
+@router.message(Command('metrics'))
+async def show_metrics(message: Message, is_admin: bool):
+    if not is_admin:
+        return
+    
+    series = await run_blocking(metrics.collect)
+    sql = summarize('db_query_seconds', 'process', series)
+    
+    text = "📈 Метрики (по суммарному времени):\n"
+    text += format_timings("🤖 Хендлеры:", summarize('bot_handler_seconds', 'handler', series),
+                           summarize('bot_handler_db_queries', 'handler', series))
+    text += format_timings("🌐 HTTP:", summarize('http_request_seconds', 'route', series),
+                           summarize('http_request_db_queries', 'route', series))
+    text += format_timings("📡 Telegram API:", summarize('telegram_api_seconds', 'method', series))
+    text += format_timings("🗄 SQL по процессам:", sql)
+    
+    await message.answer(text, reply_markup=get_admin_keyboard())
+
+def clients_query():
+    return (Order
+            .select(Order.username)
+            .where(Order.username.is_null(False))
+            .distinct())
 
 @router.message(F.text == '👥 Клиенты')
-async def show_clients(message: Message):
-    if not is_admin(message.from_user.id):
+async def show_clients(message: Message, is_admin: bool):
+    if not is_admin:
         return
     
-    orders = Order.select().where(Order.username.is_null(False))
-    usernames = list(set([o.username for o in orders]))
+    page = await run_blocking(paginate, clients_query(), Order.username)
     
-    if not usernames:
+    if not page.items:
         await message.answer("❌ Нет клиентов с username", reply_markup=get_admin_keyboard())
         return
     
     keyboard = create_pagination_keyboard(
-        items=usernames,
-        page=0,
-        per_page=10,
+        page=page,
         callback_prefix='clients',
-        get_button_text=lambda u: f"@{u}",
-        get_button_data=lambda u: f"client_{u}"
+        get_button_text=lambda o: f"@{o.username}",
+        get_button_data=lambda o: f"client_{o.username}"
     )
     
     await message.answer("👥 Клиенты:", reply_markup=keyboard)
 
 @router.callback_query(F.data.startswith('clients_page_'))
 async def clients_pagination(callback: CallbackQuery):
-    page = int(callback.data.split('_')[-1])
-    orders = Order.select().where(Order.username.is_null(False))
-    usernames = list(set([o.username for o in orders]))
+    cursor = parse_page_callback(callback.data, 'clients')
+    page = await run_blocking(paginate, clients_query(), Order.username, cursor)
     
     keyboard = create_pagination_keyboard(
-        items=usernames,
         page=page,
-        per_page=10,
         callback_prefix='clients',
-        get_button_text=lambda u: f"@{u}",
-        get_button_data=lambda u: f"client_{u}"
+        get_button_text=lambda o: f"@{o.username}",
+        get_button_data=lambda o: f"client_{o.username}"
     )
     
     await callback.message.edit_reply_markup(reply_markup=keyboard)
@@ -580,16 +635,15 @@ async def clients_pagination(callback: CallbackQuery):
 async def show_client_stats(callback: CallbackQuery):
     username = callback.data.split('_', 1)[1]
     
-    orders = Order.select().where(Order.username == username)
-    total_revenue = sum([float(o.total_amount) for o in orders])
+    summary = await run_blocking(get_client_summary, username)
     
     text = f"👤 Клиент: @{username}\n\n"
-    text += f"🛒 Заказов: {orders.count()}\n"
-    text += f"💰 Выручка: {total_revenue:.2f} ₽\n\n"
+    text += f"🛒 Заказов: {summary.orders_count}\n"
+    text += f"💰 Выручка: {float(summary.revenue):.2f} ₽\n\n"
     text += "📦 Заказы:"
 
     keyboard = []
-    for order in orders:
+    for order in summary.orders:
         keyboard.append([InlineKeyboardButton(
             text=f"#{order.id} — {float(order.total_amount):.2f} ₽",
             callback_data=f"order_{order.id}"
@@ -602,16 +656,13 @@ async def show_client_stats(callback: CallbackQuery):
 
 @router.callback_query(F.data == 'back_to_clients')
 async def back_to_clients(callback: CallbackQuery):
-    orders = Order.select().where(Order.username.is_null(False))
-    usernames = list(set([o.username for o in orders]))
+    page = await run_blocking(paginate, clients_query(), Order.username)
     
     keyboard = create_pagination_keyboard(
-        items=usernames,
-        page=0,
-        per_page=10,
+        page=page,
         callback_prefix='clients',
-        get_button_text=lambda u: f"@{u}",
-        get_button_data=lambda u: f"client_{u}"
+        get_button_text=lambda o: f"@{o.username}",
+        get_button_data=lambda o: f"client_{o.username}"
     )
     
     await callback.message.edit_text("👥 Клиенты:", reply_markup=keyboard)
@@ -619,7 +670,11 @@ async def back_to_clients(callback: CallbackQuery):
 @router.callback_query(F.data.startswith('order_'))
 async def show_order_details(callback: CallbackQuery):
     order_id = int(callback.data.split('_')[1])
-    order = Order.get_by_id(order_id)
+    details = await run_blocking(get_order_details, order_id)
+    if details is None:
+        await callback.answer("❌ Заказ не найден")
+        return
+    order, items = details
     
     text = f"📋 Заказ #{order.id}\n\n"
     text += f"👤 {order.first_name} {order.last_name}\n"
@@ -630,7 +685,7 @@ async def show_order_details(callback: CallbackQuery):
     text += f"💰 {float(order.total_amount):.2f} ₽\n\n"
     text += "📦 Товары:\n"
     
-    for item in order.items:
+    for item in items:
         text += f"  • {item.product_name} — {item.quantity} шт × {float(item.price):.2f} ₽\n"
     
     if order.comment:
@@ -643,16 +698,18 @@ async def show_order_details(callback: CallbackQuery):
     
     await callback.message.edit_text(text, reply_markup=keyboard)
 
-@router.message(F.text == '📥 Получить Excel')
-async def download_excel(message: Message):
-    if not is_admin(message.from_user.id):
+@router.message(F.text == '📥 Получить Excel', flags={'rate_limit': {'rate': 0.1, 'burst': 2}})
+async def download_excel(message: Message, is_admin: bool):
+    if not is_admin:
         return
     
     try:
-        if config.EXCEL_PATH.exists():
-            file = FSInputFile(config.EXCEL_PATH)
+        try:
+            file = FSInputFile(await run_blocking(get_excel_file))
+            await message.answer_document(file, caption="📥 Заказы")
+        except FileNotFoundError:
+            # Pruned by a web worker before upload; build it again
+            file = FSInputFile(await run_blocking(get_excel_file))
             await message.answer_document(file, caption="📥 Заказы")
-        else:
-            await message.answer("❌ Файл не найден", reply_markup=get_admin_keyboard())
     except Exception as e:
         await message.answer(f"❌ Ошибка: {e}", reply_markup=get_admin_keyboard())
@@ -3,22 +3,15 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 from bot.keyboards import get_main_keyboard, get_admin_keyboard
-from bot.states.admin import UserOrders
-from web.models import User
+from bot.handlers.user_orders import MY_ORDERS_LIMIT, user_orders_keyboard, user_orders_page
+from bot.utils import run_blocking
+from web.utils import register_user
 
 router = Router()
 
-def is_admin(user_id: int) -> bool:
-    try:
-        user = User.get(User.telegram_id == user_id)
-        return user.is_admin
-    except User.DoesNotExist:
-        return False
-
 @router.message(Command('start'))
 async def cmd_start(message: Message):
-    user_id = message.from_user.id
-    User.get_or_create(telegram_id=user_id)
+    await run_blocking(register_user, message.from_user.id, message.from_user.username)
     
     await message.answer(
         "👋 Добро пожаловать в Print Shop!\n\n"
@@ -35,55 +28,33 @@ async def open_shop(message: Message):
     )
 
 
-@router.message(F.text == '📦 Мои заказы')
-async def my_orders_start(message: Message, state: FSMContext):
-    username = message.from_user.username
+@router.message(F.text == '📦 Мои заказы', flags=MY_ORDERS_LIMIT)
+async def my_orders_start(message: Message):
+    await run_blocking(register_user, message.from_user.id, message.from_user.username)
+    page = await run_blocking(user_orders_page, message.from_user.id)
 
-    if not username:
+    if not page.items:
         await message.answer(
-            "❌ У вас не установлен username в Telegram\n\n"
-            "Установите username в настройках Telegram и попробуйте снова",
+            "❌ Заказы не найдены\n\n"
+            "Оформите заказ через кнопку магазина — он появится здесь",
             reply_markup=get_main_keyboard()
         )
         return
 
-    from web.models import Order
-    orders = list(Order.select().where(Order.username == username))
+    text = "📦 Ваши заказы:\n"
+    text += f"Всего: {page.total}"
 
-    if not orders:
-        await message.answer(
-            f"❌ Заказы для @{username} не найдены\n\n"
-            "Возможно, вы указали другой username при оформлении заказа",
-            reply_markup=get_main_keyboard()
-        )
-        return
-
-    from bot.utils import create_pagination_keyboard
-    keyboard = create_pagination_keyboard(
-        items=orders,
-        page=0,
-        per_page=10,
-        callback_prefix='user_orders',
-        get_button_text=lambda o: f"#{o.id} — {float(o.total_amount):.2f} ₽ ({o.created_at.strftime('%d.%m.%Y')})",
-        get_button_data=lambda o: f"user_order_{o.id}"
-    )
-
-    text = f"📦 Ваши заказы (@{username}):\n"
-    text += f"Всего: {len(orders)}"
-
-    await message.answer(text, reply_markup=keyboard)
+    await message.answer(text, reply_markup=user_orders_keyboard(page))
 
 @router.message(Command('help'))
-async def cmd_help(message: Message):
-    user_id = message.from_user.id
-    
+async def cmd_help(message: Message, is_admin: bool):
     help_text = "ℹ️ Справка:\n\n"
     help_text += "/start - начать работу\n"
     help_text += "/help - показать справку\n"
     help_text += "🛍 Открыть магазин - перейти в каталог\n"
     help_text += "📦 Мои заказы - посмотреть заказы\n"
     
-    if is_admin(user_id):
+    if is_admin:
         help_text += "\n👑 Админ команды:\n"
         help_text += "/admin - админ-панель\n"
         help_text += "➕ Добавить товар\n"
@@ -94,19 +65,17 @@ async def cmd_help(message: Message):
     
     await message.answer(
         help_text,
-        reply_markup=get_admin_keyboard() if is_admin(user_id) else get_main_keyboard()
+        reply_markup=get_admin_keyboard() if is_admin else get_main_keyboard()
     )
 
 @router.message()
-async def handle_unknown(message: Message, state: FSMContext):
+async def handle_unknown(message: Message, state: FSMContext, is_admin: bool):
     current_state = await state.get_state()
 
     if current_state:
         return
 
-    user_id = message.from_user.id
-
-    if is_admin(user_id):
+    if is_admin:
         await message.answer(
             "🤔 Не понял команду. Используйте кнопки меню или /help",
             reply_markup=get_admin_keyboard()
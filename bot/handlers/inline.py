@@ -0,0 +1,44 @@
+from aiogram import Router
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+from bot.utils import run_blocking
+from web.models import Product
+from web.utils import search_products
+from config import config
+
+router = Router()
+
+def inline_results(query, offset):
+    if query:
+        return search_products(query, limit=config.SEARCH_LIMIT, offset=offset)
+    return list(Product
+                .select()
+                .where(Product.is_active == True)
+                .order_by(Product.id)
+                .limit(config.SEARCH_LIMIT)
+                .offset(offset))
+
+def product_article(product):
+    text = f"📦 {product.name}\n\n"
+    if product.description:
+        text += f"📝 {product.description}\n\n"
+    text += f"💰 Цена: {float(product.price):.2f} ₽"
+    
+    return InlineQueryResultArticle(
+        id=str(product.id),
+        title=product.name,
+        description=f"{float(product.price):.2f} ₽" + (f" — {product.description}" if product.description else ""),
+        thumbnail_url=f"{config.WEBAPP_URL.rstrip('/')}{product.photo_path}" if product.photo_path else None,
+        input_message_content=InputTextMessageContent(message_text=text)
+    )
+
+@router.inline_query()
+async def search_inline(inline_query: InlineQuery):
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    products = await run_blocking(inline_results, inline_query.query.strip(), offset)
+    
+    next_offset = str(offset + len(products)) if len(products) == config.SEARCH_LIMIT else ''
+    await inline_query.answer(
+        [product_article(p) for p in products],
+        cache_time=30,
+        next_offset=next_offset
+    )
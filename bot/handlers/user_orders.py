@@ -1,78 +1,42 @@
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
-from aiogram.fsm.context import FSMContext
-from bot.states.admin import UserOrders
-from bot.keyboards import get_main_keyboard
-from bot.utils import create_pagination_keyboard
-from web.models import Order
+from aiogram.types import CallbackQuery
+from bot.keyboards import order_renders, page_key
+from bot.utils import create_pagination_keyboard, paginate, parse_page_callback, run_blocking
+from web.models import Order, User
+from web.utils import get_order_details
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 router = Router()
 
-@router.message(UserOrders.waiting_username)
-async def search_user_orders(message: Message, state: FSMContext):
-    username = message.text.strip().lstrip('@')
-    
-    if not username:
-        await message.answer("❌ Введите username", reply_markup=get_main_keyboard())
-        await state.clear()
-        return
-    
-    orders = list(Order.select().where(Order.username == username))
-    
-    if not orders:
-        await message.answer(
-            f"❌ Заказы для @{username} не найдены\n\n"
-            "Проверьте правильность username",
-            reply_markup=get_main_keyboard()
-        )
-        await state.clear()
-        return
-    
-    await state.update_data(username=username)
-    
-    keyboard = create_pagination_keyboard(
-        items=orders,
-        page=0,
-        per_page=10,
-        callback_prefix='user_orders',
-        get_button_text=lambda o: f"#{o.id} — {float(o.total_amount):.2f} ₽ ({o.created_at.strftime('%d.%m.%Y')})",
-        get_button_data=lambda o: f"user_order_{o.id}"
-    )
-    
-    text = f"📦 Ваши заказы (@{username}):\n"
-    text += f"Всего: {len(orders)}"
-    
-    await message.answer(text, reply_markup=keyboard)
-    await state.clear()
+# "Мои заказы" and the back button run the same COUNT + page query, so they
+# share one bucket per user.
+MY_ORDERS_LIMIT = {'rate_limit': {'rate': 0.2, 'burst': 3, 'key': 'my_orders'}}
+BROWSE_LIMIT = {'rate_limit': {'rate': 1, 'burst': 5}}
 
-@router.callback_query(F.data.startswith('user_orders_page_'))
-async def user_orders_pagination(callback: CallbackQuery, state: FSMContext):
-    data = await state.get_data()
-    username = data.get('username')
-    
-    if not username:
-        await callback.answer("❌ Ошибка")
-        return
-    
-    page = int(callback.data.split('_')[-1])
-    orders = list(Order.select().where(Order.username == username))
-    
-    keyboard = create_pagination_keyboard(
-        items=orders,
+def user_orders_page(telegram_id, cursor=None):
+    query = Order.select().join(User).where(User.telegram_id == telegram_id)
+    return paginate(query, Order.id, cursor)
+
+BACK_TO_ORDERS_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text='🔙 К списку заказов', callback_data='back_to_user_orders')]
+])
+
+def build_user_orders_keyboard(page):
+    return create_pagination_keyboard(
         page=page,
-        per_page=10,
         callback_prefix='user_orders',
         get_button_text=lambda o: f"#{o.id} — {float(o.total_amount):.2f} ₽ ({o.created_at.strftime('%d.%m.%Y')})",
         get_button_data=lambda o: f"user_order_{o.id}"
     )
-    
-    await callback.message.edit_reply_markup(reply_markup=keyboard)
 
-@router.callback_query(F.data.startswith('user_order_'))
-async def show_user_order(callback: CallbackQuery):
-    order_id = int(callback.data.split('_')[2])
-    order = Order.get_by_id(order_id)
+def user_orders_keyboard(page):
+    return order_renders.render(page_key('user_orders', page), lambda: build_user_orders_keyboard(page))
+
+def render_user_order(order_id, telegram_id):
+    details = get_order_details(order_id, telegram_id)
+    if details is None:
+        return None
+    order, items = details
     
     text = f"📋 Заказ #{order.id}\n\n"
     text += f"📅 {order.created_at.strftime('%d.%m.%Y %H:%M')}\n"
@@ -81,44 +45,47 @@ async def show_user_order(callback: CallbackQuery):
     text += f"💰 Итого: {float(order.total_amount):.2f} ₽\n\n"
     text += "📦 Товары:\n"
     
-    for item in order.items:
+    for item in items:
         text += f"  • {item.product_name}\n"
         text += f"    {item.quantity} шт × {float(item.price):.2f} ₽ = {float(item.price * item.quantity):.2f} ₽\n"
     
     if order.comment:
         text += f"\n💬 Комментарий: {order.comment}"
-    
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text='🔙 К списку заказов', callback_data='back_to_user_orders')]
-    ])
-    
-    await callback.message.edit_text(text, reply_markup=keyboard)
+    return text
 
+@router.callback_query(F.data.startswith('user_orders_page_'), flags=BROWSE_LIMIT)
+async def user_orders_pagination(callback: CallbackQuery):
+    cursor = parse_page_callback(callback.data, 'user_orders')
+    page = await run_blocking(user_orders_page, callback.from_user.id, cursor)
+    
+    await callback.message.edit_reply_markup(reply_markup=user_orders_keyboard(page))
 
-@router.callback_query(F.data == 'back_to_user_orders')
-async def back_to_user_orders(callback: CallbackQuery):
-    username = callback.from_user.username
+@router.callback_query(F.data.startswith('user_order_'), flags=BROWSE_LIMIT)
+async def show_user_order(callback: CallbackQuery):
+    order_id = int(callback.data.split('_')[2])
+    # Orders are immutable after checkout, so a rendered order is reused
+    # without touching the database.
+    key = ('order', order_id, callback.from_user.id)
+    text = order_renders.get(key)
+    if text is None:
+        text = await run_blocking(render_user_order, order_id, callback.from_user.id)
+        if text is None:
+            await callback.answer("❌ Заказ не найден")
+            return
+        order_renders.set(key, text)
+    
+    await callback.message.edit_text(text, reply_markup=BACK_TO_ORDERS_KEYBOARD)
 
-    if not username:
-        await callback.message.edit_text("❌ Username не найден")
-        return
 
-    orders = list(Order.select().where(Order.username == username))
+@router.callback_query(F.data == 'back_to_user_orders', flags=MY_ORDERS_LIMIT)
+async def back_to_user_orders(callback: CallbackQuery):
+    page = await run_blocking(user_orders_page, callback.from_user.id)
 
-    if not orders:
-        await callback.message.edit_text(f"❌ Заказы для @{username} не найдены")
+    if not page.items:
+        await callback.message.edit_text("❌ Заказы не найдены")
         return
 
-    keyboard = create_pagination_keyboard(
-        items=orders,
-        page=0,
-        per_page=10,
-        callback_prefix='user_orders',
-        get_button_text=lambda o: f"#{o.id} — {float(o.total_amount):.2f} ₽ ({o.created_at.strftime('%d.%m.%Y')})",
-        get_button_data=lambda o: f"user_order_{o.id}"
-    )
-
-    text = f"📦 Ваши заказы (@{username}):\n"
-    text += f"Всего: {len(orders)}"
+    text = "📦 Ваши заказы:\n"
+    text += f"Всего: {page.total}"
 
-    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.message.edit_text(text, reply_markup=user_orders_keyboard(page))
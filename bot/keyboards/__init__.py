@@ -1,6 +1,7 @@
 from .main import *
+from .cache import RenderCache, catalog_renders, order_renders, page_key
 __all__ = [
     'get_main_keyboard', 'get_admin_keyboard', 'get_cancel_keyboard',
     'get_add_product_choice', 'get_skip_photo_keyboard', 'get_back_keyboard',
-    'get_product_actions_keyboard'
+    'get_product_actions_keyboard', 'RenderCache', 'catalog_renders', 'order_renders', 'page_key'
 ]
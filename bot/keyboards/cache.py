@@ -0,0 +1,51 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from web.utils import catalog_version
+from config import config
+
+class RenderCache:
+    def __init__(self, max_size: int, version: Optional[Callable[[], Hashable]] = None):
+        self.max_size = max_size
+        self.version = version
+        self._version = None
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if self.version is not None:
+            version = self.version()
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def render(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.set(key, value)
+        return value
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+def page_key(prefix: str, page) -> tuple:
+    return (prefix, page.page, page.total_pages, page.prev_cursor, page.next_cursor,
+            tuple(item.id for item in page.items))
+
+# Product names and prices change, so these are dropped whenever the catalog
+# version file moves; orders never change after checkout.
+catalog_renders = RenderCache(config.RENDER_CACHE_SIZE, version=catalog_version)
+order_renders = RenderCache(config.RENDER_CACHE_SIZE)
@@ -1,6 +1,11 @@
+from functools import cache, lru_cache
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, WebAppInfo, InlineKeyboardMarkup, InlineKeyboardButton
 from config import config
 
+# Keyboards are built once and shared between updates; callers must not
+# mutate the returned markup.
+
+@cache
 def get_main_keyboard():
     keyboard = [
         [KeyboardButton(text='🛍 Открыть магазин', web_app=WebAppInfo(url=config.WEBAPP_URL))],
@@ -8,6 +13,7 @@ def get_main_keyboard():
     ]
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
+@cache
 def get_admin_keyboard():
     keyboard = [
         [KeyboardButton(text='➕ Добавить товар')],
@@ -18,12 +24,14 @@ def get_admin_keyboard():
     ]
     return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
+@cache
 def get_cancel_keyboard():
     return ReplyKeyboardMarkup(
         keyboard=[[KeyboardButton(text='❌ Отмена')]],
         resize_keyboard=True
     )
 
+@cache
 def get_add_product_choice():
     keyboard = [
         [InlineKeyboardButton(text='✍️ Добавить вручную', callback_data='add_manual')],
@@ -31,16 +39,19 @@ def get_add_product_choice():
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@cache
 def get_skip_photo_keyboard():
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text='⏭️ Пропустить фото', callback_data='skip_photo')]
     ])
 
+@cache
 def get_back_keyboard():
     return InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text='🔙 Назад', callback_data='back_to_products')]
     ])
 
+@lru_cache(maxsize=config.RENDER_CACHE_SIZE)
 def get_product_actions_keyboard(product_id):
     keyboard = [
         [InlineKeyboardButton(text='✏️ Изменить название', callback_data=f'edit_name_{product_id}')],
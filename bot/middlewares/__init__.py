@@ -0,0 +1,7 @@
+from .admin import AdminRoleMiddleware, admin_cache, lookup_admin
+from .throttling import ThrottlingMiddleware, TokenBuckets
+from .timing import HandlerTimingMiddleware
+__all__ = [
+    'AdminRoleMiddleware', 'admin_cache', 'lookup_admin', 'ThrottlingMiddleware', 'TokenBuckets',
+    'HandlerTimingMiddleware'
+]
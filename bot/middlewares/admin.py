@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from bot.utils.executor import run_blocking
+from web.models import User
+from config import config
+
+class AdminRoleCache:
+    def __init__(self, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        # Read on the event loop and written from pool threads by lookup_admin.
+        self._lock = threading.Lock()
+        self._roles = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[bool]:
+        with self._lock:
+            entry = self._roles.get(user_id)
+            if entry is None:
+                return None
+            is_admin, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._roles[user_id]
+                return None
+            self._roles.move_to_end(user_id)
+            return is_admin
+
+    def set(self, user_id: int, is_admin: bool):
+        with self._lock:
+            self._roles[user_id] = (is_admin, time.monotonic() + self.ttl)
+            self._roles.move_to_end(user_id)
+            while len(self._roles) > self.max_size:
+                self._roles.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        with self._lock:
+            if user_id is None:
+                self._roles.clear()
+            else:
+                self._roles.pop(user_id, None)
+
+admin_cache = AdminRoleCache(ttl=config.ADMIN_CACHE_TTL, max_size=config.ADMIN_CACHE_SIZE)
+
+def lookup_admin(user_id: int) -> bool:
+    is_admin = admin_cache.get(user_id)
+    if is_admin is None:
+        is_admin = bool(
+            User.select(User.is_admin)
+            .where(User.telegram_id == user_id)
+            .scalar()
+        )
+        admin_cache.set(user_id, is_admin)
+    return is_admin
+
+class AdminRoleMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get('event_from_user')
+        is_admin = False
+        if user:
+            is_admin = admin_cache.get(user.id)
+            if is_admin is None:
+                is_admin = await run_blocking(lookup_admin, user.id)
+        data['is_admin'] = is_admin
+        return await handler(event, data)
@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Message, TelegramObject
+from config import config
+
+THROTTLED_TEXT = "⏳ Слишком часто, подождите немного"
+
+class TokenBuckets:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        # key -> [tokens, updated_at, warned]; a list per entry keeps the
+        # table at one small object per active (user, route) pair.
+        self._buckets = OrderedDict()
+
+    def consume(self, key: Hashable, rate: float, burst: int) -> bool:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(burst), now, False]
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            bucket[2] = False
+            return True
+        return False
+
+    def should_warn(self, key: Hashable) -> bool:
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket[2]:
+            return False
+        bucket[2] = True
+        return True
+
+    def __len__(self):
+        return len(self._buckets)
+
+buckets = TokenBuckets(max_size=config.THROTTLE_TABLE_SIZE)
+
+class ThrottlingMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get('event_from_user')
+        if user is None:
+            return await handler(event, data)
+
+        limit = get_flag(data, 'rate_limit') or {}
+        rate = limit.get('rate', config.THROTTLE_RATE)
+        burst = limit.get('burst', config.THROTTLE_BURST)
+        callback = data['handler'].callback
+        key = (user.id, limit.get('key') or f"{callback.__module__}.{callback.__name__}")
+
+        if buckets.consume(key, rate, burst):
+            return await handler(event, data)
+
+        # Only the first rejected update in a row gets a reply, so flooding
+        # does not turn into a flood of outgoing messages. Later callbacks
+        # are still answered silently, or the button keeps spinning.
+        if isinstance(event, (CallbackQuery, Message)) and buckets.should_warn(key):
+            await event.answer(THROTTLED_TEXT)
+        elif isinstance(event, CallbackQuery):
+            await event.answer()
+        return None
@@ -0,0 +1,31 @@
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from web.utils.metrics import metrics, track_queries
+from config import config
+
+logger = logging.getLogger(__name__)
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        callback = data['handler'].callback
+        name = f"{callback.__module__}.{callback.__name__}"
+        started = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                return await handler(event, data)
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.observe('bot_handler_seconds', elapsed, handler=name)
+                metrics.observe('bot_handler_db_queries', queries.queries, handler=name)
+                metrics.observe('bot_handler_db_seconds', queries.seconds, handler=name)
+                if elapsed * 1000 > config.SLOW_HANDLER_MS:
+                    logger.warning(f"Slow handler {name}: {elapsed * 1000:.0f} ms, "
+                                   f"{queries.queries} queries in {queries.seconds * 1000:.0f} ms")
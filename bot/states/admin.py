@@ -18,5 +18,5 @@ class EditProduct(StatesGroup):
 class ImportProducts(StatesGroup):
     waiting_file = State()
 
-class UserOrders(StatesGroup):
-    waiting_username = State()
+class SearchProducts(StatesGroup):
+    waiting_query = State()
@@ -1,2 +1,9 @@
-from .pagination import create_pagination_keyboard
-__all__ = ['create_pagination_keyboard']
+from .executor import blocking, run_blocking, shutdown_executor
+from .pagination import Page, create_pagination_keyboard, paginate, parse_page_callback
+from .storage import SQLiteStorage
+from .webhook import BoundedRequestHandler
+__all__ = [
+    'blocking', 'run_blocking', 'shutdown_executor',
+    'Page', 'create_pagination_keyboard', 'paginate', 'parse_page_callback', 'SQLiteStorage',
+    'BoundedRequestHandler'
+]
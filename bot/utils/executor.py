@@ -0,0 +1,26 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from config import config
+
+_executor = ThreadPoolExecutor(
+    max_workers=config.BOT_BLOCKING_WORKERS,
+    thread_name_prefix='bot-blocking'
+)
+
+async def run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context into the worker so per-update query stats
+    # see the queries made there.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, func, *args, **kwargs))
+
+def blocking(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
+
+def shutdown_executor():
+    _executor.shutdown(wait=True)
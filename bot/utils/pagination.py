@@ -1,48 +1,84 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from typing import List, Callable
+from typing import List, Callable, NamedTuple, Optional
+
+class Page(NamedTuple):
+    items: List
+    page: int
+    total: int
+    total_pages: int
+    prev_cursor: Optional[str]
+    next_cursor: Optional[str]
+
+def parse_page_callback(data: str, callback_prefix: str) -> str:
+    return data[len(f"{callback_prefix}_page_"):]
+
+def paginate(query, key, cursor: Optional[str] = None, per_page: int = 10) -> Page:
+    page = 0
+    direction = None
+    value = None
+
+    if cursor:
+        parts = cursor.split('_', 2)
+        page = int(parts[0])
+        if len(parts) == 3:
+            direction, value = parts[1], parts[2]
+
+    if direction == 'n':
+        items = list(query.where(key > value).order_by(key).limit(per_page))
+    elif direction == 'p':
+        items = list(query.where(key < value).order_by(key.desc()).limit(per_page))
+        items.reverse()
+    else:
+        page = 0
+        items = list(query.order_by(key).limit(per_page))
+
+    total = query.count()
+    total_pages = (total + per_page - 1) // per_page
+
+    prev_cursor = None
+    next_cursor = None
+    if items and page > 0:
+        prev_cursor = '0' if page == 1 else f"{page-1}_p_{getattr(items[0], key.name)}"
+    if items and page < total_pages - 1:
+        next_cursor = f"{page+1}_n_{getattr(items[-1], key.name)}"
+
+    return Page(items, page, total, total_pages, prev_cursor, next_cursor)
 
 def create_pagination_keyboard(
-    items: List,
-    page: int,
-    per_page: int,
+    page: Page,
     callback_prefix: str,
     get_button_text: Callable,
     get_button_data: Callable
 ) -> InlineKeyboardMarkup:
     keyboard = []
 
-    start_idx = page * per_page
-    end_idx = min(start_idx + per_page, len(items))
-    page_items = items[start_idx:end_idx]
-
-    for item in page_items:
+    for item in page.items:
         keyboard.append([InlineKeyboardButton(
             text=get_button_text(item),
             callback_data=get_button_data(item)
         )])
 
     nav_buttons = []
-    total_pages = (len(items) + per_page - 1) // per_page
-    
-    if page > 0:
+
+    if page.prev_cursor is not None:
         nav_buttons.append(InlineKeyboardButton(
             text="◀️ Назад",
-            callback_data=f"{callback_prefix}_page_{page-1}"
+            callback_data=f"{callback_prefix}_page_{page.prev_cursor}"
         ))
-    
-    if total_pages > 1:
+
+    if page.total_pages > 1:
         nav_buttons.append(InlineKeyboardButton(
-            text=f"{page+1}/{total_pages}",
+            text=f"{page.page+1}/{page.total_pages}",
             callback_data="page_info"
         ))
-    
-    if page < total_pages - 1:
+
+    if page.next_cursor is not None:
         nav_buttons.append(InlineKeyboardButton(
             text="Вперёд ▶️",
-            callback_data=f"{callback_prefix}_page_{page+1}"
+            callback_data=f"{callback_prefix}_page_{page.next_cursor}"
         ))
-    
+
     if nav_buttons:
         keyboard.append(nav_buttons)
-    
+
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+class SQLiteStorage(BaseStorage):
+    def __init__(
+        self,
+        path,
+        ttl: int = 86400,
+        cache_size: int = 10000,
+        flush_interval: float = 1.0,
+        key_builder: Optional[KeyBuilder] = None
+    ):
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS fsm ('
+            'key TEXT PRIMARY KEY, state TEXT, data TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS fsm_expires_at ON fsm (expires_at)')
+        self._conn.execute('DELETE FROM fsm WHERE expires_at < ?', (time.time(),))
+        self._db_lock = threading.Lock()
+
+        self._cache = OrderedDict()
+        self._dirty = {}
+        self._flushing = {}
+        self._flush_task = None
+        self._last_purge = 0.0
+        self._closed = False
+
+    def _remember(self, key, record):
+        self._cache[key] = record
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _load(self, key):
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT state, data, expires_at FROM fsm WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+
+    async def _get_record(self, storage_key: StorageKey):
+        key = self.key_builder.build(storage_key)
+
+        if key in self._cache:
+            record = self._cache[key]
+            self._cache.move_to_end(key)
+        elif key in self._dirty:
+            record = self._dirty[key]
+        elif key in self._flushing:
+            record = self._flushing[key]
+        else:
+            record = await asyncio.to_thread(self._load, key)
+            if key in self._cache:
+                record = self._cache[key]
+            else:
+                self._remember(key, record)
+
+        if record is None or record[2] < time.time():
+            return key, None, {}
+        return key, record[0], record[1]
+
+    def _put(self, key, state, data):
+        if state is None and not data:
+            record = None
+        else:
+            record = (state, data, time.time() + self.ttl)
+        self._remember(key, record)
+        self._dirty[key] = record
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    def _write(self, batch, purge):
+        upserts = [
+            (key, record[0], json.dumps(record[1], ensure_ascii=False), record[2])
+            for key, record in batch.items() if record is not None
+        ]
+        deletes = [(key,) for key, record in batch.items() if record is None]
+        with self._db_lock:
+            self._conn.execute('BEGIN')
+            try:
+                if upserts:
+                    self._conn.executemany(
+                        'INSERT INTO fsm (key, state, data, expires_at) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT(key) DO UPDATE SET state = excluded.state, '
+                        'data = excluded.data, expires_at = excluded.expires_at',
+                        upserts
+                    )
+                if deletes:
+                    self._conn.executemany('DELETE FROM fsm WHERE key = ?', deletes)
+                if purge:
+                    self._conn.execute('DELETE FROM fsm WHERE expires_at < ?', (time.time(),))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        self._flushing, self._dirty = self._dirty, {}
+        purge = time.monotonic() - self._last_purge > self.ttl / 24
+        try:
+            await asyncio.to_thread(self._write, self._flushing, purge)
+            if purge:
+                self._last_purge = time.monotonic()
+        except Exception:
+            self._flushing.update(self._dirty)
+            self._dirty = self._flushing
+            raise
+        finally:
+            self._flushing = {}
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key, _, data = await self._get_record(key)
+        self._put(storage_key, state.state if isinstance(state, State) else state, data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        _, state, _ = await self._get_record(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        storage_key, state, _ = await self._get_record(key)
+        self._put(storage_key, state, dict(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, _, data = await self._get_record(key)
+        return dict(data)
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        with self._db_lock:
+            self._conn.close()
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Any, Dict
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+logger = logging.getLogger(__name__)
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_concurrency: int,
+                 drain_timeout: float, **kwargs: Any):
+        super().__init__(dispatcher, bot, handle_in_background=True, **kwargs)
+        self.drain_timeout = drain_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._draining = False
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        if self._draining:
+            return web.Response(status=503)
+        update = await request.json(loads=bot.session.json_loads)
+        # Waiting for a slot keeps the request open, so Telegram (bounded by
+        # max_connections) slows down instead of updates piling up in memory.
+        await self._slots.acquire()
+        task = asyncio.create_task(self._process(bot, update))
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def _process(self, bot: Bot, update: Dict[str, Any]):
+        try:
+            await self._background_feed_update(bot, update)
+        except Exception:
+            # Dispatcher.feed_update has already logged the traceback; the task
+            # must not fail with an unretrieved exception.
+            pass
+        finally:
+            self._slots.release()
+
+    async def drain(self):
+        self._draining = True
+        pending = set(self._background_feed_update_tasks)
+        if not pending:
+            return
+        logger.info(f"Waiting for {len(pending)} in-flight updates")
+        _, still_running = await asyncio.wait(pending, timeout=self.drain_timeout)
+        for task in still_running:
+            task.cancel()
+        if still_running:
+            logger.warning(f"Cancelled {len(still_running)} updates after {self.drain_timeout}s")
+
+    async def close(self):
+        await self.drain()
+        await super().close()
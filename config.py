@@ -9,17 +9,80 @@ class Config:
     BOT_TOKEN = os.getenv('BOT_TOKEN')
     WEBAPP_URL = os.getenv('WEBAPP_URL', 'https://localhost:5000')
     ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'admin123')
+    WEBAPP_INIT_DATA_TTL = int(os.getenv('WEBAPP_INIT_DATA_TTL', 86400))
     
     FLASK_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
     FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', 4))
+    WEB_KEEPALIVE = int(os.getenv('WEB_KEEPALIVE', 5))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', 30))
     
     DATABASE_PATH = BASE_DIR / os.getenv('DATABASE_PATH', 'database/shop.db')
-    EXCEL_PATH = BASE_DIR / os.getenv('EXCEL_PATH', 'exports/orders.xlsx')
+    DB_JOURNAL_MODE = os.getenv('DB_JOURNAL_MODE', 'wal')
+    DB_SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'normal')
+    DB_BUSY_TIMEOUT = int(os.getenv('DB_BUSY_TIMEOUT', 5000))
+    DB_CACHE_SIZE = int(os.getenv('DB_CACHE_SIZE', -16000))
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', 64 * 1024 * 1024))
+    DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 32))
+    DB_STALE_TIMEOUT = int(os.getenv('DB_STALE_TIMEOUT', 300))
+    EXPORT_CACHE_PATH = BASE_DIR / os.getenv('EXPORT_CACHE_PATH', 'exports/cache')
+    EXPORT_CACHE_MAX_FILES = int(os.getenv('EXPORT_CACHE_MAX_FILES', 20))
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 86400))
+    SEARCH_LIMIT = int(os.getenv('SEARCH_LIMIT', 50))
+    SEARCH_RANK_LIMIT = int(os.getenv('SEARCH_RANK_LIMIT', 1000))
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 1000))
+    IMPORT_PROGRESS_INTERVAL = float(os.getenv('IMPORT_PROGRESS_INTERVAL', 2.0))
+    STATIC_PATH = BASE_DIR / 'web/static'
     PHOTOS_PATH = BASE_DIR / 'web/static/assets/photos'
+    ASSETS_DIST_PATH = BASE_DIR / 'web/static/dist'
+    STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 31536000))
+    CATALOG_VERSION_PATH = BASE_DIR / os.getenv('CATALOG_VERSION_PATH', 'database/catalog.version')
     
     SSL_CERT_PATH = BASE_DIR / os.getenv('SSL_CERT_PATH', 'certs/cert.pem')
     SSL_KEY_PATH = BASE_DIR / os.getenv('SSL_KEY_PATH', 'certs/key.pem')
 
+    FSM_STORAGE = os.getenv('FSM_STORAGE', 'sqlite')
+    FSM_STORAGE_PATH = BASE_DIR / os.getenv('FSM_STORAGE_PATH', 'database/fsm.db')
+    FSM_STATE_TTL = int(os.getenv('FSM_STATE_TTL', 86400))
+    FSM_CACHE_SIZE = int(os.getenv('FSM_CACHE_SIZE', 10000))
+    FSM_FLUSH_INTERVAL = float(os.getenv('FSM_FLUSH_INTERVAL', 1.0))
+
+    BOT_MODE = os.getenv('BOT_MODE', 'polling')
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+    WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+    WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+    WEBHOOK_MAX_CONCURRENCY = int(os.getenv('WEBHOOK_MAX_CONCURRENCY', 40))
+    WEBHOOK_DRAIN_TIMEOUT = float(os.getenv('WEBHOOK_DRAIN_TIMEOUT', 30))
+
+    BOT_BLOCKING_WORKERS = int(os.getenv('BOT_BLOCKING_WORKERS', 4))
+    SLOW_HANDLER_MS = int(os.getenv('SLOW_HANDLER_MS', 500))
+
+    THROTTLE_RATE = float(os.getenv('THROTTLE_RATE', 2))
+    THROTTLE_BURST = int(os.getenv('THROTTLE_BURST', 5))
+    THROTTLE_TABLE_SIZE = int(os.getenv('THROTTLE_TABLE_SIZE', 10000))
+
+    SEND_GLOBAL_RATE = float(os.getenv('SEND_GLOBAL_RATE', 30))
+    SEND_CHAT_RATE = float(os.getenv('SEND_CHAT_RATE', 1))
+    SEND_CHAT_BURST = int(os.getenv('SEND_CHAT_BURST', 3))
+    SEND_RETRIES = int(os.getenv('SEND_RETRIES', 5))
+
+    METRICS_PATH = BASE_DIR / os.getenv('METRICS_PATH', 'exports/metrics')
+    METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', 15))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+    ADMIN_CACHE_TTL = int(os.getenv('ADMIN_CACHE_TTL', 300))
+    ADMIN_CACHE_SIZE = int(os.getenv('ADMIN_CACHE_SIZE', 10000))
+    RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', 2000))
+
+    NOTIFY_QUEUE_SIZE = int(os.getenv('NOTIFY_QUEUE_SIZE', 1000))
+    NOTIFY_CONCURRENCY = int(os.getenv('NOTIFY_CONCURRENCY', 5))
+    NOTIFY_RETRIES = int(os.getenv('NOTIFY_RETRIES', 3))
+    NOTIFY_ADMIN_CACHE_TTL = int(os.getenv('NOTIFY_ADMIN_CACHE_TTL', 60))
+
     MAX_NAME_LENGTH = 100
     MAX_DESCRIPTION_LENGTH = 500
     MAX_PRICE = 1000000
@@ -29,8 +92,14 @@ class Config:
     def validate(cls):
         if not cls.BOT_TOKEN:
             raise ValueError("BOT_TOKEN is not set")
+        if cls.BOT_MODE not in ('polling', 'webhook'):
+            raise ValueError("BOT_MODE must be 'polling' or 'webhook'")
+        if cls.BOT_MODE == 'webhook' and not cls.WEBHOOK_SECRET:
+            raise ValueError("WEBHOOK_SECRET is required in webhook mode")
         cls.DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        cls.EXCEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        cls.FSM_STORAGE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        cls.EXPORT_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        cls.METRICS_PATH.mkdir(parents=True, exist_ok=True)
         cls.SSL_CERT_PATH.parent.mkdir(parents=True, exist_ok=True)
         cls.PHOTOS_PATH.mkdir(parents=True, exist_ok=True)
         return True
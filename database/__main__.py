@@ -0,0 +1,27 @@
+import sys
+from database import db_manager
+from config import config
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'migrate'
+    config.DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    db_manager.initialize()
+
+    if command == 'migrate':
+        db_manager.create_tables()
+        print(f"Schema version: {db_manager.schema_version()}")
+    elif command == 'check':
+        problems = db_manager.check_query_plans()
+        for problem in problems:
+            print(f"Full scan in {problem}")
+        if problems:
+            sys.exit(1)
+        print("All hot queries use indexes")
+    else:
+        print("Usage: python -m database [migrate|check]")
+        sys.exit(2)
+
+    db_manager.close()
+
+if __name__ == '__main__':
+    main()
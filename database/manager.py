@@ -1,23 +1,199 @@
-from peewee import SqliteDatabase
-from web.models import database_proxy, User, Product, Order, OrderItem
+import logging
+import re
+import time
+from pathlib import Path
+from peewee import JOIN, fn
+from playhouse.pool import PooledSqliteDatabase
+from web.models import (database_proxy, User, Product, ProductIndex, Order, OrderItem, DailySales,
+                        ProductSales, IdempotencyKey)
+from web.utils.metrics import metrics
 from config import config
 
+logger = logging.getLogger(__name__)
+
+def _migration_hot_query_indexes(db):
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "orders_username_id" ON "orders" ("username", "id")')
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "orders_created_at" ON "orders" ("created_at")')
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "products_is_active_id" ON "products" ("is_active", "id")')
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "users_is_admin_telegram_id" ON "users" ("is_admin", "telegram_id")')
+
+def _migration_sales_summary(db):
+    from web.utils.stats import rebuild_sales_summary
+    rebuild_sales_summary()
+
+def _migration_product_name_index(db):
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "products_name" ON "products" ("name")')
+
+def _migration_content_addressed_photos(db):
+    from web.utils.photos import photo_variants, store_photo
+    legacy_paths = [
+        row.photo_path for row in
+        Product.select(Product.photo_path).where(Product.photo_path.is_null(False)).distinct()
+        if photo_variants(row.photo_path) is None
+    ]
+    converted = []
+    for photo_path in legacy_paths:
+        legacy_file = config.PHOTOS_PATH / Path(photo_path).name
+        try:
+            new_path = store_photo(legacy_file.read_bytes())
+        except Exception as e:
+            logger.warning(f"Skipping photo {photo_path}: {e}")
+            continue
+        Product.update(photo_path=new_path).where(Product.photo_path == photo_path).execute()
+        converted.append(legacy_file)
+
+    def remove_originals():
+        for legacy_file in converted:
+            legacy_file.unlink(missing_ok=True)
+    return remove_originals
+
+def _migration_order_user(db):
+    from web.utils.customers import backfill_order_users
+    if 'user_id' not in {column.name for column in db.get_columns('orders')}:
+        db.execute_sql('ALTER TABLE "orders" ADD COLUMN "user_id" INTEGER REFERENCES "users" ("id")')
+    db.execute_sql('CREATE INDEX IF NOT EXISTS "orders_user_id" ON "orders" ("user_id")')
+    linked = backfill_order_users()
+    logger.info(f"Linked {linked} existing orders to users by username")
+
+def _migration_product_search(db):
+    ProductIndex.create_table(safe=True)
+    db.execute_sql(
+        'CREATE TRIGGER IF NOT EXISTS "products_fts_insert" AFTER INSERT ON "products" BEGIN '
+        'INSERT INTO "products_fts" ("rowid", "name", "description") '
+        'VALUES (new."id", new."name", new."description"); END'
+    )
+    db.execute_sql(
+        'CREATE TRIGGER IF NOT EXISTS "products_fts_delete" AFTER DELETE ON "products" BEGIN '
+        'INSERT INTO "products_fts" ("products_fts", "rowid", "name", "description") '
+        'VALUES (\'delete\', old."id", old."name", old."description"); END'
+    )
+    db.execute_sql(
+        'CREATE TRIGGER IF NOT EXISTS "products_fts_update" AFTER UPDATE OF "name", "description" ON "products" '
+        'WHEN old."name" IS NOT new."name" OR old."description" IS NOT new."description" BEGIN '
+        'INSERT INTO "products_fts" ("products_fts", "rowid", "name", "description") '
+        'VALUES (\'delete\', old."id", old."name", old."description"); '
+        'INSERT INTO "products_fts" ("rowid", "name", "description") '
+        'VALUES (new."id", new."name", new."description"); END'
+    )
+    ProductIndex.rebuild()
+
+MIGRATIONS = [
+    (1, 'indexes for hot queries', _migration_hot_query_indexes),
+    (2, 'backfill sales summary tables', _migration_sales_summary),
+    (3, 'index products by name for imports', _migration_product_name_index),
+    (4, 'content-addressed photo variants', _migration_content_addressed_photos),
+    (5, 'link orders to telegram users', _migration_order_user),
+    (6, 'full-text product search', _migration_product_search),
+]
+
+HOT_QUERIES = {
+    'active products page': lambda: (Product.select()
+                                     .where((Product.is_active == True) & (Product.id > 0))
+                                     .order_by(Product.id).limit(10)),
+    'active products count': lambda: Product.select(fn.COUNT(Product.id)).where(Product.is_active == True),
+    'products by name': lambda: (Product.select(Product.name, fn.MIN(Product.id))
+                                 .where(Product.name.in_(['']))
+                                 .group_by(Product.name)),
+    'product search': lambda: (Product.select()
+                               .join(ProductIndex, on=(ProductIndex.rowid == Product.id))
+                               .where(ProductIndex.match('"a"*') & (Product.is_active == True))
+                               .order_by(ProductIndex.rank(), ProductIndex.rowid).limit(10)),
+    'admin role lookup': lambda: User.select().where(User.telegram_id == 0),
+    'admin ids': lambda: User.select(User.telegram_id).where(User.is_admin == True),
+    'orders by username': lambda: (Order.select()
+                                   .where((Order.username == '') & (Order.id > 0))
+                                   .order_by(Order.id).limit(10)),
+    'orders by user': lambda: (Order.select()
+                               .join(User)
+                               .where((User.telegram_id == 0) & (Order.id > 0))
+                               .order_by(Order.id).limit(10)),
+    'unlinked orders by username': lambda: (Order.select(Order.id)
+                                            .where((Order.username == '') & Order.user.is_null())),
+    'clients page': lambda: (Order.select(Order.username)
+                             .where(Order.username.is_null(False))
+                             .distinct().order_by(Order.username).limit(10)),
+    'order items': lambda: OrderItem.select().where(OrderItem.order == 0),
+    'order details': lambda: (Order.select(Order, OrderItem)
+                              .join(OrderItem, JOIN.LEFT_OUTER, on=(OrderItem.order == Order.id))
+                              .where(Order.id == 0)),
+    'orders by date': lambda: Order.select(Order.id).where(Order.created_at >= '2000-01-01'),
+    'idempotency key lookup': lambda: IdempotencyKey.select().where(IdempotencyKey.key == ''),
+    'expired idempotency keys': lambda: (IdempotencyKey.select(IdempotencyKey.key)
+                                         .where(IdempotencyKey.created_at < '2000-01-01')),
+}
+
+FULL_SCAN = re.compile(r'^SCAN \w+$')
+
+class InstrumentedSqliteDatabase(PooledSqliteDatabase):
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().execute_sql(sql, params, *args, **kwargs)
+        finally:
+            metrics.record_query(time.perf_counter() - started)
+
 class DatabaseManager:
     def __init__(self):
         self.db = None
-        self.models = [User, Product, Order, OrderItem]
+        self.models = [User, Product, Order, OrderItem, DailySales, ProductSales, IdempotencyKey]
     
     def initialize(self):
-        self.db = SqliteDatabase(config.DATABASE_PATH)
+        self.db = InstrumentedSqliteDatabase(
+            config.DATABASE_PATH,
+            pragmas={
+                'journal_mode': config.DB_JOURNAL_MODE,
+                'synchronous': config.DB_SYNCHRONOUS,
+                'busy_timeout': config.DB_BUSY_TIMEOUT,
+                'cache_size': config.DB_CACHE_SIZE,
+                'mmap_size': config.DB_MMAP_SIZE,
+            },
+            timeout=config.DB_BUSY_TIMEOUT / 1000,
+            max_connections=config.DB_MAX_CONNECTIONS,
+            stale_timeout=config.DB_STALE_TIMEOUT,
+            check_same_thread=False
+        )
         database_proxy.initialize(self.db)
         return self.db
     
     def create_tables(self):
         with self.db:
             self.db.create_tables(self.models, safe=True)
+        self.migrate()
+        for problem in self.check_query_plans():
+            logger.warning(f"Hot query falls back to a full scan: {problem}")
+    
+    def schema_version(self):
+        return self.db.execute_sql('PRAGMA user_version').fetchone()[0]
+    
+    def migrate(self):
+        with self.db.connection_context():
+            current = self.schema_version()
+            for version, description, migration in MIGRATIONS:
+                if version <= current:
+                    continue
+                logger.info(f"Applying migration {version}: {description}")
+                # A migration may return a callback for work that must not be
+                # rolled back, such as deleting files; it runs after commit.
+                with self.db.atomic():
+                    after_commit = migration(self.db)
+                    self.db.execute_sql(f'PRAGMA user_version = {version}')
+                if after_commit:
+                    after_commit()
+            return self.schema_version()
+    
+    def check_query_plans(self):
+        problems = []
+        with self.db.connection_context():
+            for name, build in HOT_QUERIES.items():
+                sql, params = build().sql()
+                plan = self.db.execute_sql(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+                scans = [row[3] for row in plan if FULL_SCAN.match(row[3])]
+                if scans:
+                    problems.append(f"{name}: {', '.join(scans)}")
+        return problems
     
     def close(self):
-        if self.db and not self.db.is_closed():
-            self.db.close()
+        if self.db:
+            self.db.close_all()
 
 db_manager = DatabaseManager()
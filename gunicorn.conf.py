@@ -0,0 +1,29 @@
+from config import Config
+from database import db_manager
+
+bind = f"{Config.FLASK_HOST}:{Config.FLASK_PORT}"
+workers = Config.WEB_WORKERS
+worker_class = 'gthread'
+threads = Config.WEB_THREADS
+keepalive = Config.WEB_KEEPALIVE
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_TIMEOUT
+preload_app = True
+wsgi_app = 'wsgi:application'
+
+if Config.SSL_CERT_PATH.is_file() and Config.SSL_KEY_PATH.is_file():
+    certfile = str(Config.SSL_CERT_PATH)
+    keyfile = str(Config.SSL_KEY_PATH)
+    ciphers = 'ECDHE+AESGCM:ECDHE+CHACHA20:!aNULL:!MD5'
+
+def on_starting(server):
+    Config.validate()
+    db_manager.initialize()
+    db_manager.create_tables()
+    db_manager.close()
+
+def post_fork(server, worker):
+    db_manager.initialize()
+
+def worker_exit(server, worker):
+    db_manager.close()
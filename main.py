@@ -1,33 +1,126 @@
 import asyncio
+import gc
 import logging
+import signal
+from aiohttp import web
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
-from bot.handlers import commands, admin, user_orders
+from aiogram.webhook.aiohttp_server import setup_application
+from bot.handlers import commands, admin, inline, user_orders
+from bot.middlewares import AdminRoleMiddleware, HandlerTimingMiddleware, ThrottlingMiddleware
+from bot.utils import BoundedRequestHandler, SQLiteStorage, run_blocking, shutdown_executor
 from database import db_manager
+from web.utils import SendScheduler, TelegramApiTiming, metrics
 from config import config
 
 logging.basicConfig(level=logging.INFO)
 
+def create_storage():
+    if config.FSM_STORAGE == 'memory':
+        return MemoryStorage()
+    return SQLiteStorage(
+        config.FSM_STORAGE_PATH,
+        ttl=config.FSM_STATE_TTL,
+        cache_size=config.FSM_CACHE_SIZE,
+        flush_interval=config.FSM_FLUSH_INTERVAL
+    )
+
+def create_dispatcher(storage):
+    dp = Dispatcher(storage=storage)
+    dp.update.outer_middleware(AdminRoleMiddleware())
+    dp.message.middleware(ThrottlingMiddleware())
+    dp.callback_query.middleware(ThrottlingMiddleware())
+    dp.message.middleware(HandlerTimingMiddleware())
+    dp.callback_query.middleware(HandlerTimingMiddleware())
+
+    dp.include_router(admin.router)
+    dp.include_router(inline.router)
+    dp.include_router(user_orders.router)
+    dp.include_router(commands.router)
+    return dp
+
+def create_webhook_app(dp, bot):
+    app = web.Application()
+    handler = BoundedRequestHandler(
+        dp, bot,
+        secret_token=config.WEBHOOK_SECRET,
+        max_concurrency=config.WEBHOOK_MAX_CONCURRENCY,
+        drain_timeout=config.WEBHOOK_DRAIN_TIMEOUT
+    )
+    # Registered before the dispatcher's shutdown hooks so in-flight updates
+    # finish while storage and the thread pool are still open.
+    handler.register(app, path=config.WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+async def set_webhook(bot, dispatcher):
+    if not config.WEBHOOK_URL:
+        return
+    await bot.set_webhook(
+        url=config.WEBHOOK_URL.rstrip('/') + config.WEBHOOK_PATH,
+        secret_token=config.WEBHOOK_SECRET,
+        max_connections=config.WEBHOOK_MAX_CONCURRENCY,
+        allowed_updates=dispatcher.resolve_used_update_types()
+    )
+
+async def run_webhook(dp, bot):
+    dp.startup.register(set_webhook)
+    runner = web.AppRunner(create_webhook_app(dp, bot), shutdown_timeout=config.WEBHOOK_DRAIN_TIMEOUT)
+    await runner.setup()
+    site = web.TCPSite(runner, config.WEBHOOK_HOST, config.WEBHOOK_PORT)
+    await site.start()
+    print(f"Webhook listening on {config.WEBHOOK_HOST}:{config.WEBHOOK_PORT}{config.WEBHOOK_PATH}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+
+async def flush_metrics():
+    while True:
+        await asyncio.sleep(config.METRICS_FLUSH_INTERVAL)
+        await run_blocking(metrics.flush)
+
 async def main():
+    storage = None
+    flusher = None
+    metrics.role = 'bot'
     try:
         config.validate()
         db_manager.initialize()
         db_manager.create_tables()
-        
-        storage = MemoryStorage()
+
+        storage = create_storage()
         bot = Bot(token=config.BOT_TOKEN)
-        dp = Dispatcher(storage=storage)
-        
-        dp.include_router(admin.router)
-        dp.include_router(user_orders.router)
-        dp.include_router(commands.router)
+        bot.session.middleware(SendScheduler())
+        # Registered after the scheduler so only the API round trip is timed.
+        bot.session.middleware(TelegramApiTiming())
+        dp = create_dispatcher(storage)
+
+        # Startup objects (aiogram types, models) never die; keeping them out of
+        # full collections stops GC pauses from stalling the event loop.
+        gc.freeze()
 
+        flusher = asyncio.create_task(flush_metrics())
         print("Bot started")
-        await dp.start_polling(bot)
+        if config.BOT_MODE == 'webhook':
+            await run_webhook(dp, bot)
+        else:
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
     except Exception as e:
         print(f"Error: {e}")
         raise
     finally:
+        if flusher:
+            flusher.cancel()
+        if storage:
+            await storage.close()
+        shutdown_executor()
         db_manager.close()
 
 if __name__ == '__main__':
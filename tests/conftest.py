@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from config import config
+from database import db_manager
+
+@pytest.fixture
+def database(tmp_path):
+    config.DATABASE_PATH = tmp_path / 'test.db'
+    config.CATALOG_VERSION_PATH = tmp_path / 'catalog.version'
+    config.METRICS_PATH = tmp_path / 'metrics'
+    db_manager.initialize()
+    db_manager.create_tables()
+    yield db_manager.db
+    db_manager.close()
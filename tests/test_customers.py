@@ -0,0 +1,31 @@
+from decimal import Decimal
+
+from bot.handlers.user_orders import user_orders_page
+from web.models import Order
+from web.utils import register_user
+
+def place_unlinked_order(username):
+    return Order.create(first_name='Test', last_name='Buyer', phone='+70000000000',
+                        username=username, total_amount=Decimal('100.00'))
+
+def test_orders_from_before_registration_are_linked(database):
+    order = place_unlinked_order('buyer')
+    user = register_user(500, 'buyer')
+    assert Order.get_by_id(order.id).user_id == user.id
+
+def test_orders_placed_after_registration_are_linked(database):
+    user = register_user(500, 'buyer')
+    order = place_unlinked_order('buyer')
+
+    register_user(500, 'buyer')
+
+    assert Order.get_by_id(order.id).user_id == user.id
+    assert [o.id for o in user_orders_page(500).items] == [order.id]
+
+def test_orders_of_other_usernames_stay_unlinked(database):
+    register_user(500, 'buyer')
+    order = place_unlinked_order('someone_else')
+
+    register_user(500, 'buyer')
+
+    assert Order.get_by_id(order.id).user_id is None
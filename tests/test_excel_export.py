@@ -0,0 +1,39 @@
+from decimal import Decimal
+
+import pytest
+from openpyxl import load_workbook
+
+from config import config
+from web.models import Order
+from web.utils import excel_helper
+
+@pytest.fixture
+def client(database, tmp_path, monkeypatch):
+    from app import app
+    monkeypatch.setattr(config, 'EXPORT_CACHE_PATH', tmp_path / 'cache')
+    Order.create(first_name='Test', last_name='Buyer', phone='+70000000000',
+                 username='buyer', total_amount=Decimal('100.00'))
+    return app.test_client()
+
+def test_build_leaves_no_temporary_files(client):
+    path = excel_helper.get_excel_file()
+    assert [p.name for p in config.EXPORT_CACHE_PATH.iterdir()] == [path.name]
+    assert load_workbook(path).active.max_row == 2
+
+def test_download_rebuilds_pruned_file(client, monkeypatch):
+    from web.api import orders
+    get_excel_file = orders.get_excel_file
+    calls = []
+
+    def pruned_by_another_worker(**filters):
+        path = get_excel_file(**filters)
+        calls.append(path)
+        if len(calls) == 1:
+            path.unlink()
+        return path
+
+    monkeypatch.setattr(orders, 'get_excel_file', pruned_by_another_worker)
+    response = client.get('/api/excel/latest')
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert response.data[:2] == b'PK'
@@ -0,0 +1,19 @@
+import pytest
+
+from config import config
+
+@pytest.fixture
+def client(database):
+    from app import app
+    return app.test_client()
+
+def test_metrics_closed_without_token(client, monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_TOKEN', '')
+    assert client.get('/metrics').status_code == 404
+
+def test_metrics_requires_token(client, monkeypatch):
+    monkeypatch.setattr(config, 'METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
@@ -0,0 +1,138 @@
+import asyncio
+import datetime
+import itertools
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User as TelegramUser
+
+from config import config
+from database import db_manager
+from web.models import Order, OrderItem, Product, User
+from web.utils import get_client_summary, get_order_details, track_queries
+
+BUYER_ID = 500
+ITEMS = 5
+
+class FakeSession(BaseSession):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls.append(method)
+        if type(method).__name__ == 'EditMessageText':
+            return Message(
+                message_id=1, date=datetime.datetime.now(),
+                chat=Chat(id=BUYER_ID, type='private'), text=''
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b''
+
+_ids = itertools.count(1)
+
+def callback_update(data):
+    user = TelegramUser(id=BUYER_ID, is_bot=False, first_name='Test', username='buyer')
+    return Update(update_id=next(_ids), callback_query=CallbackQuery(
+        id=str(next(_ids)), from_user=user, chat_instance='test', data=data,
+        message=Message(
+            message_id=next(_ids), date=datetime.datetime.now(),
+            chat=Chat(id=BUYER_ID, type='private'), from_user=user, text='test'
+        )
+    ))
+
+@pytest.fixture(scope='module')
+def orders(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp('db')
+    config.DATABASE_PATH = tmp / 'test.db'
+    config.CATALOG_VERSION_PATH = tmp / 'catalog.version'
+    config.METRICS_PATH = tmp / 'metrics'
+    db_manager.initialize()
+    db_manager.create_tables()
+
+    product = Product.create(name='Кружка', description='Белая', price=Decimal('100.00'))
+    buyer = User.create(telegram_id=BUYER_ID, username='buyer')
+    created = []
+    for _ in range(3):
+        order = Order.create(
+            user=buyer, first_name='Test', last_name='Buyer', phone='+70000000000',
+            username='buyer', total_amount=Decimal('500.00')
+        )
+        OrderItem.insert_many([
+            {'order': order, 'product': product, 'product_name': f'Кружка {k}',
+             'quantity': 1, 'price': Decimal('100.00')}
+            for k in range(ITEMS)
+        ]).execute()
+        created.append(order)
+    empty = Order.create(first_name='No', last_name='Items', phone='+7', username='empty',
+                         total_amount=Decimal('0'))
+    yield created, empty
+    db_manager.close()
+
+@pytest.fixture(scope='module')
+def dispatcher(orders):
+    from bot.handlers import admin, user_orders
+
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.include_router(admin.router)
+    dp.include_router(user_orders.router)
+    return dp
+
+def count_queries(func, *args):
+    with track_queries() as queries:
+        result = func(*args)
+    return result, queries.queries
+
+def test_order_details_is_one_query(orders):
+    created, empty = orders
+    details, queries = count_queries(get_order_details, created[0].id)
+    assert queries == 1
+    assert len(details.items) == ITEMS
+
+    details, queries = count_queries(get_order_details, empty.id)
+    assert queries == 1
+    assert details.items == []
+
+def test_user_scoped_order_details_is_one_query(orders):
+    created, empty = orders
+    details, queries = count_queries(get_order_details, created[1].id, BUYER_ID)
+    assert queries == 1
+    assert len(details.items) == ITEMS
+
+    details, queries = count_queries(get_order_details, empty.id, BUYER_ID)
+    assert queries == 1
+    assert details is None
+
+def test_client_summary_is_one_query(orders):
+    summary, queries = count_queries(get_client_summary, 'buyer')
+    assert queries == 1
+    assert summary.orders_count == 3
+    assert summary.revenue == Decimal('1500.00')
+
+@pytest.mark.parametrize('data', ['order_{id}', 'user_order_{id}', 'client_buyer'])
+def test_order_screen_handlers_are_one_query(orders, dispatcher, data):
+    from bot.keyboards import order_renders
+    created, _ = orders
+    order_renders.invalidate()
+    session = FakeSession()
+    bot = Bot(token='42:TEST', session=session)
+
+    async def feed():
+        with track_queries() as queries:
+            await dispatcher.feed_update(bot, callback_update(data.format(id=created[2].id)))
+        return queries.queries
+
+    assert asyncio.run(feed()) == 1
+    assert [type(call).__name__ for call in session.calls] == ['EditMessageText']
@@ -0,0 +1,56 @@
+import io
+
+import pytest
+from PIL import Image
+
+from config import config
+from database import db_manager
+from database.manager import _migration_content_addressed_photos
+from web.models import Product
+from web.utils import photos
+
+def legacy_photo(name, color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), color).save(buffer, 'JPEG')
+    (config.PHOTOS_PATH / name).write_bytes(buffer.getvalue())
+    return Product.create(name=name, description='', price=1, photo_path=f'{photos.PHOTOS_URL}/{name}')
+
+@pytest.fixture
+def legacy_photos(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PHOTOS_PATH', tmp_path / 'photos')
+    config.PHOTOS_PATH.mkdir()
+    good = legacy_photo('good.jpg', 'red')
+    bad = legacy_photo('bomb.jpg', 'blue')
+
+    store_photo = photos.store_photo
+    def refuse_bomb(data):
+        if data == (config.PHOTOS_PATH / 'bomb.jpg').read_bytes():
+            raise Image.DecompressionBombError('too many pixels')
+        return store_photo(data)
+    monkeypatch.setattr(photos, 'store_photo', refuse_bomb)
+
+    database.execute_sql('PRAGMA user_version = 3')
+    return good, bad
+
+def test_bad_image_is_skipped_and_originals_removed_after_commit(legacy_photos):
+    good, bad = legacy_photos
+
+    db_manager.migrate()
+
+    assert photos.photo_variants(Product.get_by_id(good.id).photo_path) is not None
+    assert not (config.PHOTOS_PATH / 'good.jpg').exists()
+    assert Product.get_by_id(bad.id).photo_path.endswith('/bomb.jpg')
+    assert (config.PHOTOS_PATH / 'bomb.jpg').exists()
+
+def test_rolled_back_migration_keeps_originals(legacy_photos, monkeypatch):
+    good, _ = legacy_photos
+    def convert_then_fail(db):
+        _migration_content_addressed_photos(db)
+        raise RuntimeError('database error')
+    monkeypatch.setattr('database.manager.MIGRATIONS', [(4, 'photos', convert_then_fail)])
+
+    with pytest.raises(RuntimeError):
+        db_manager.migrate()
+
+    assert Product.get_by_id(good.id).photo_path.endswith('/good.jpg')
+    assert (config.PHOTOS_PATH / 'good.jpg').exists()
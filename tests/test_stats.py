@@ -0,0 +1,30 @@
+from datetime import date
+from decimal import Decimal
+
+from web.models import DailySales
+from web.utils import stats
+from web.utils.stats import get_sales_stats
+
+class FixedDate(date):
+    @classmethod
+    def today(cls):
+        return date(2025, 1, 8)
+
+def test_week_across_new_year_is_one_group(database, monkeypatch):
+    monkeypatch.setattr(stats, 'date', FixedDate)
+    DailySales.insert_many([
+        {'day': date(2024, 12, 29), 'orders_count': 1, 'revenue': Decimal('10.00')},
+        {'day': date(2024, 12, 30), 'orders_count': 1, 'revenue': Decimal('100.00')},
+        {'day': date(2024, 12, 31), 'orders_count': 2, 'revenue': Decimal('200.00')},
+        {'day': date(2025, 1, 1), 'orders_count': 3, 'revenue': Decimal('300.00')},
+        {'day': date(2025, 1, 5), 'orders_count': 4, 'revenue': Decimal('400.00')},
+        {'day': date(2025, 1, 8), 'orders_count': 5, 'revenue': Decimal('500.00')},
+    ]).execute()
+
+    by_week = get_sales_stats(weeks=3)['by_week']
+
+    assert [(week, count, Decimal(revenue)) for week, count, revenue in by_week] == [
+        (date(2025, 1, 6), 5, Decimal('500.00')),
+        (date(2024, 12, 30), 10, Decimal('1000.00')),
+        (date(2024, 12, 23), 1, Decimal('10.00')),
+    ]
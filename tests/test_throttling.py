@@ -0,0 +1,34 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.types import CallbackQuery, User as TelegramUser
+
+from bot.middlewares import throttling
+from bot.middlewares.throttling import THROTTLED_TEXT, ThrottlingMiddleware, TokenBuckets
+
+def test_dropped_callbacks_are_always_answered(monkeypatch):
+    answers = []
+
+    async def answer(self, text=None, **kwargs):
+        answers.append(text)
+
+    monkeypatch.setattr(CallbackQuery, 'answer', answer)
+    monkeypatch.setattr(throttling, 'buckets', TokenBuckets(max_size=10))
+    user = TelegramUser(id=1, is_bot=False, first_name='Test')
+    event = CallbackQuery(id='1', from_user=user, chat_instance='test', data='catalog')
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event)
+
+    async def feed():
+        middleware = ThrottlingMiddleware()
+        data = {'event_from_user': user,
+                'handler': SimpleNamespace(callback=handler,
+                                           flags={'rate_limit': {'rate': 0.001, 'burst': 1}})}
+        for _ in range(4):
+            await middleware(handler, event, data)
+
+    asyncio.run(feed())
+    assert len(handled) == 1
+    assert answers == [THROTTLED_TEXT, None, None]
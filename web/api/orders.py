@@ -1,25 +1,17 @@
 from flask import Blueprint, jsonify, request, send_file
-from datetime import datetime
-from web.models import Order, OrderItem, Product, User
-from web.utils import add_order_to_excel, get_excel_file
-import asyncio
-from aiogram import Bot
-from config import config
+from datetime import datetime, timedelta
+from web.models import database_proxy
+from web.utils import (CheckoutError, IdempotencyConflict, WebAppAuthError,
+                       get_excel_file, is_valid_key, lookup_response, notifier, place_order,
+                       request_fingerprint, store_response, webapp_user)
 
 orders_bp = Blueprint('orders', __name__)
 
-async def notify_admins(order_text):
-    try:
-        bot = Bot(token=config.BOT_TOKEN)
-        admins = User.select().where(User.is_admin == True)
-        for admin in admins:
-            try:
-                await bot.send_message(admin.telegram_id, order_text)
-            except:
-                pass
-        await bot.session.close()
-    except:
-        pass
+def _replay(stored):
+    response = jsonify(stored.body)
+    response.status_code = stored.status
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
 
 @orders_bp.route('/checkout', methods=['POST'])
 def checkout():
@@ -36,53 +28,45 @@ def checkout():
         if not first_name or not last_name or not phone or not cart_items:
             return jsonify({'success': False, 'error': 'Missing required fields'}), 400
         
-        total_amount = 0
-        order_items_data = []
+        idempotency_key = request.headers.get('Idempotency-Key')
+        fingerprint = None
+        if idempotency_key is not None:
+            if not is_valid_key(idempotency_key):
+                return jsonify({'success': False, 'error': 'Invalid Idempotency-Key'}), 400
+            fingerprint = request_fingerprint(data)
         
-        for item in cart_items:
-            product = Product.get_by_id(item['product_id'])
-            quantity = item['quantity']
-            item_total = float(product.price) * quantity
-            total_amount += item_total
+        try:
+            if idempotency_key:
+                stored = lookup_response(idempotency_key, fingerprint)
+                if stored:
+                    return _replay(stored)
             
-            order_items_data.append({
-                'product': product,
-                'product_name': product.name,
-                'quantity': quantity,
-                'price': product.price
-            })
-        
-        order = Order.create(
-            first_name=first_name,
-            last_name=last_name,
-            phone=phone,
-            username=username if username else None,
-            total_amount=total_amount,
-            comment=comment
-        )
-        
-        for item_data in order_items_data:
-            OrderItem.create(
-                order=order,
-                product=item_data['product'],
-                product_name=item_data['product_name'],
-                quantity=item_data['quantity'],
-                price=item_data['price']
-            )
-        
-        excel_data = {
-            'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'first_name': first_name,
-            'last_name': last_name,
-            'phone': phone,
-            'username': username,
-            'items': [{
-                'product_name': item['product_name'],
-                'quantity': item['quantity']
-            } for item in order_items_data]
-        }
-        
-        add_order_to_excel(excel_data)
+            with database_proxy.atomic('IMMEDIATE'):
+                if idempotency_key:
+                    stored = lookup_response(idempotency_key, fingerprint)
+                    if stored:
+                        return _replay(stored)
+                
+                user = webapp_user(request.headers.get('X-Telegram-Init-Data'))
+                if not username and user is not None:
+                    username = user.username or ''
+                order, order_items_data = place_order(
+                    first_name, last_name, phone, username, comment, cart_items, user=user
+                )
+                result = {
+                    'success': True,
+                    'order_id': order.id,
+                    'message': 'Order created successfully'
+                }
+                if idempotency_key:
+                    store_response(idempotency_key, fingerprint, 201, result)
+        except CheckoutError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except IdempotencyConflict as e:
+            return jsonify({'success': False, 'error': str(e)}), 422
+        except WebAppAuthError as e:
+            return jsonify({'success': False, 'error': str(e)}), 401
+        total_amount = order.total_amount
         
         notification = f"🛒 Новый заказ #{order.id}\n\n"
         notification += f"👤 {first_name} {last_name}\n"
@@ -96,16 +80,9 @@ def checkout():
         if comment:
             notification += f"\n💬 {comment}"
         
-        try:
-            asyncio.run(notify_admins(notification))
-        except:
-            pass
+        notifier.notify_admins(notification)
         
-        return jsonify({
-            'success': True,
-            'order_id': order.id,
-            'message': 'Order created successfully'
-        }), 201
+        return jsonify(result), 201
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -113,12 +90,27 @@ def checkout():
 @orders_bp.route('/excel/latest', methods=['GET'])
 def download_excel():
     try:
-        excel_path = get_excel_file()
-        return send_file(
-            excel_path,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name='orders.xlsx'
-        )
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        status = request.args.get('status') or None
+        try:
+            date_from = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Dates must be in YYYY-MM-DD format'}), 400
+
+        def send_excel():
+            return send_file(
+                get_excel_file(date_from=date_from, date_to=date_to, status=status),
+                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                as_attachment=True,
+                download_name='orders.xlsx'
+            )
+
+        try:
+            return send_excel()
+        except FileNotFoundError:
+            # Pruned by another worker between lookup and open; build it again
+            return send_excel()
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
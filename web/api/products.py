@@ -1,19 +1,21 @@
-from flask import Blueprint, jsonify
-from web.models import Product
+from flask import Blueprint, Response, jsonify, request
+from web.utils import get_catalog, search_products, serialize_product
 
 products_bp = Blueprint('products', __name__)
 
 @products_bp.route('/products', methods=['GET'])
 def get_products():
     try:
-        products = Product.select().where(Product.is_active == True)
-        products_list = [{
-            'id': p.id,
-            'name': p.name,
-            'description': p.description,
-            'price': float(p.price),
-            'photo_path': p.photo_path
-        } for p in products]
-        return jsonify({'success': True, 'products': products_list}), 200
+        query = request.args.get('q', '').strip()
+        if query:
+            products = search_products(query)
+            return jsonify({'success': True, 'products': [serialize_product(p) for p in products]})
+        
+        snapshot = get_catalog()
+        response = Response(snapshot.body, status=200, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.last_modified = snapshot.last_modified
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,2 +1,2 @@
-from .models import User, Product, Order, OrderItem, database_proxy
-__all__ = ['User', 'Product', 'Order', 'OrderItem', 'database_proxy']
+from .models import User, Product, ProductIndex, Order, OrderItem, DailySales, ProductSales, IdempotencyKey, database_proxy
+__all__ = ['User', 'Product', 'ProductIndex', 'Order', 'OrderItem', 'DailySales', 'ProductSales', 'IdempotencyKey', 'database_proxy']
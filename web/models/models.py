@@ -1,4 +1,5 @@
 from peewee import *
+from playhouse.sqlite_ext import FTS5Model, RowIDField, SearchField
 from datetime import datetime
 
 database_proxy = DatabaseProxy()
@@ -27,7 +28,22 @@ class Product(BaseModel):
     class Meta:
         table_name = 'products'
 
+class ProductIndex(BaseModel, FTS5Model):
+    rowid = RowIDField()
+    name = SearchField()
+    description = SearchField()
+    
+    class Meta:
+        table_name = 'products_fts'
+        options = {
+            'content': 'products',
+            'content_rowid': 'id',
+            'tokenize': 'unicode61 remove_diacritics 2',
+            'prefix': '2 3'
+        }
+
 class Order(BaseModel):
+    user = ForeignKeyField(User, null=True, backref='orders', index=False)
     first_name = CharField()
     last_name = CharField()
     phone = CharField()
@@ -49,3 +65,30 @@ class OrderItem(BaseModel):
     
     class Meta:
         table_name = 'order_items'
+
+class DailySales(BaseModel):
+    day = DateField(primary_key=True)
+    orders_count = IntegerField(default=0)
+    revenue = DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        table_name = 'daily_sales'
+
+class ProductSales(BaseModel):
+    product_id = IntegerField(primary_key=True)
+    product_name = CharField()
+    quantity = IntegerField(default=0)
+    revenue = DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        table_name = 'product_sales'
+
+class IdempotencyKey(BaseModel):
+    key = CharField(primary_key=True, max_length=64)
+    fingerprint = CharField(max_length=64)
+    status = IntegerField()
+    body = TextField()
+    created_at = DateTimeField(default=datetime.now, index=True)
+    
+    class Meta:
+        table_name = 'idempotency_keys'
@@ -1,6 +1,8 @@
 let cart = [];
 let products = [];
 let scrollbarWidth = 0;
+let checkoutAttempt = null;
+let checkoutInFlight = false;
 
 function initApp() {
     calculateScrollbarWidth();
@@ -59,15 +61,24 @@ function validateUsername(e) {
 }
 
 async function loadProducts() {
+    const cached = loadCatalogFromStorage();
+    if (cached) {
+        products = cached.products;
+        renderProducts(products);
+    }
+
     try {
-        const response = await fetch('/api/products');
+        const headers = cached && cached.etag ? { 'If-None-Match': cached.etag } : {};
+        const response = await fetch('/api/products', { headers, cache: 'no-store' });
+        if (response.status === 304) return;
         const data = await response.json();
         if (data.success) {
             products = data.products;
             renderProducts(products);
+            saveCatalogToStorage(response.headers.get('ETag'), products);
         }
     } catch (error) {
-        showToast('Ошибка загрузки товаров');
+        if (!cached) showToast('Ошибка загрузки товаров');
     }
 }
 
@@ -86,7 +97,7 @@ function renderProducts(productsToRender) {
     
     grid.innerHTML = productsToRender.map(product => {
         const imageContent = product.photo_path ? 
-            `<img src="${product.photo_path}" alt="${product.name}">` : 
+            productImage(product, '(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw') : 
             '🖨️';
         return `
             <div class="product-card" onclick="openProductModal(${product.id})">
@@ -104,6 +115,11 @@ function renderProducts(productsToRender) {
     }).join('');
 }
 
+function productImage(product, sizes) {
+    const srcset = product.photo_srcset ? ` srcset="${product.photo_srcset}" sizes="${sizes}"` : '';
+    return `<img src="${product.photo_path}"${srcset} alt="${product.name}" loading="lazy" decoding="async">`;
+}
+
 function handleSearch(e) {
     const query = e.target.value.toLowerCase();
     const filtered = products.filter(p => 
@@ -118,7 +134,7 @@ function openProductModal(productId) {
     if (!product) return;
     
     const imageContent = product.photo_path ? 
-        `<img src="${product.photo_path}" alt="${product.name}">` : 
+        productImage(product, '100vw') : 
         '🖨️';
     
     document.getElementById('productModalContent').innerHTML = `
@@ -243,7 +259,7 @@ function renderCartItems() {
     container.innerHTML = `
         ${cart.map(item => {
             const imageContent = item.product.photo_path ? 
-                `<img src="${item.product.photo_path}" alt="${item.product.name}">` : 
+                `<img src="${item.product.photo_thumb || item.product.photo_path}" alt="${item.product.name}" loading="lazy">` : 
                 '🖨️';
             return `
                 <div class="cart-item">
@@ -329,14 +345,25 @@ async function handleCheckout(e) {
         }))
     };
     
+    if (checkoutInFlight) return;
+    const body = JSON.stringify(orderData);
+    const submitButton = e.target.querySelector('button[type="submit"]');
+    checkoutInFlight = true;
+    if (submitButton) submitButton.disabled = true;
+    
     try {
         const response = await fetch('/api/checkout', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(orderData)
+            headers: {
+                'Content-Type': 'application/json',
+                'Idempotency-Key': getCheckoutKey(body),
+                'X-Telegram-Init-Data': window.Telegram?.WebApp?.initData || ''
+            },
+            body: body
         });
         const data = await response.json();
         if (data.success) {
+            checkoutAttempt = null;
             showToast('Заказ успешно оформлен!');
             cart = [];
             updateCartUI();
@@ -348,7 +375,25 @@ async function handleCheckout(e) {
         }
     } catch (error) {
         showToast('Ошибка при оформлении заказа');
+    } finally {
+        checkoutInFlight = false;
+        if (submitButton) submitButton.disabled = false;
+    }
+}
+
+function getCheckoutKey(body) {
+    if (!checkoutAttempt || checkoutAttempt.body !== body) {
+        checkoutAttempt = { body: body, key: generateKey() };
+    }
+    return checkoutAttempt.key;
+}
+
+function generateKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
     }
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
 }
 
 function formatPrice(price) {
@@ -375,6 +420,24 @@ function loadCartFromStorage() {
     if (saved) cart = JSON.parse(saved);
 }
 
+function saveCatalogToStorage(etag, products) {
+    if (!etag) return;
+    try {
+        localStorage.setItem('catalog', JSON.stringify({ etag, products }));
+    } catch (error) {
+        localStorage.removeItem('catalog');
+    }
+}
+
+function loadCatalogFromStorage() {
+    try {
+        const saved = localStorage.getItem('catalog');
+        return saved ? JSON.parse(saved) : null;
+    } catch (error) {
+        return null;
+    }
+}
+
 document.addEventListener('DOMContentLoaded', initApp);
 
 document.addEventListener('keydown', (e) => {
@@ -1,2 +1,26 @@
-from .excel_helper import add_order_to_excel, get_excel_file
-__all__ = ['add_order_to_excel', 'get_excel_file']
+from .assets import asset_url, build_assets, is_immutable, precompressed
+from .catalog import catalog_version, get_catalog, invalidate_catalog, serialize_product
+from .checkout import CheckoutError, place_order
+from .customers import WebAppAuthError, backfill_order_users, register_user, webapp_user
+from .excel_helper import get_excel_file
+from .idempotency import (IdempotencyConflict, is_valid_key, lookup_response,
+                          request_fingerprint, store_response)
+from .metrics import (TelegramApiTiming, begin_queries, end_queries, metrics, render_prometheus,
+                      summarize, track_queries)
+from .notifications import notifier
+from .orders import ClientSummary, OrderDetails, get_client_summary, get_order_details
+from .photos import release_photo, store_photo
+from .product_import import ImportProgress, import_products
+from .search import search_products
+from .send_scheduler import BULK, INTERACTIVE, SendScheduler, priority
+__all__ = [
+    'asset_url', 'build_assets', 'is_immutable', 'precompressed',
+    'catalog_version', 'get_catalog', 'invalidate_catalog', 'serialize_product', 'CheckoutError', 'place_order',
+    'WebAppAuthError', 'backfill_order_users', 'register_user', 'webapp_user',
+    'TelegramApiTiming', 'begin_queries', 'end_queries', 'metrics', 'render_prometheus', 'summarize', 'track_queries',
+    'get_excel_file', 'IdempotencyConflict', 'is_valid_key', 'lookup_response',
+    'request_fingerprint', 'store_response', 'notifier',
+    'ClientSummary', 'OrderDetails', 'get_client_summary', 'get_order_details', 'release_photo', 'store_photo',
+    'ImportProgress', 'import_products', 'search_products',
+    'BULK', 'INTERACTIVE', 'SendScheduler', 'priority'
+]
@@ -0,0 +1,74 @@
+import gzip
+import hashlib
+import os
+import re
+from pathlib import Path
+from config import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FINGERPRINTED = ('css', 'js')
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.html')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE = re.compile(r'^(dist/.+\.[0-9a-f]{12}\.\w+|assets/photos/[0-9a-f]{32}(_\w+)?\.\w+)$')
+
+_manifest = {}
+
+def _write_atomic(path, data):
+    if path.exists() and path.read_bytes() == data:
+        return
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+def _precompress(path, data):
+    written = [path.with_name(path.name + '.gz')]
+    _write_atomic(written[0], gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        written.append(path.with_name(path.name + '.br'))
+        _write_atomic(written[1], brotli.compress(data, quality=11))
+    return written
+
+def build_assets():
+    manifest = {}
+    written = set()
+    for folder in FINGERPRINTED:
+        for source in sorted((config.STATIC_PATH / folder).rglob('*')):
+            if not source.is_file():
+                continue
+            data = source.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            relative = source.relative_to(config.STATIC_PATH)
+            target = config.ASSETS_DIST_PATH / relative.parent / f'{source.stem}.{digest}{source.suffix}'
+            target.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(target, data)
+            written.add(target)
+            if source.suffix in COMPRESSIBLE:
+                written.update(_precompress(target, data))
+            manifest[relative.as_posix()] = target.relative_to(config.STATIC_PATH).as_posix()
+
+    for stale in config.ASSETS_DIST_PATH.rglob('*'):
+        if stale.is_file() and stale not in written and not stale.name.startswith('.'):
+            stale.unlink(missing_ok=True)
+
+    _manifest.clear()
+    _manifest.update(manifest)
+    return manifest
+
+def asset_url(path):
+    return f"/static/{_manifest.get(path, path)}"
+
+def is_immutable(path):
+    return IMMUTABLE.match(path) is not None
+
+def precompressed(path, accept_encodings):
+    if Path(path).suffix not in COMPRESSIBLE:
+        return None
+    for encoding, suffix in ENCODINGS:
+        if encoding in accept_encodings and (config.STATIC_PATH / (path + suffix)).is_file():
+            return encoding, path + suffix
+    return None
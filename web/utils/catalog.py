@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import NamedTuple
+from web.models import Product
+from .photos import photo_srcset, photo_variants
+from config import config
+
+class CatalogSnapshot(NamedTuple):
+    version: tuple
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+_lock = threading.Lock()
+_snapshot = None
+
+def catalog_version():
+    try:
+        stat = config.CATALOG_VERSION_PATH.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_ino, stat.st_mtime_ns)
+
+def invalidate_catalog():
+    global _snapshot
+    config.CATALOG_VERSION_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = config.CATALOG_VERSION_PATH.with_suffix('.tmp')
+    tmp_path.write_text(str(datetime.now(timezone.utc).timestamp()))
+    os.replace(tmp_path, config.CATALOG_VERSION_PATH)
+    _snapshot = None
+
+def serialize_product(p):
+    variants = photo_variants(p.photo_path)
+    return {
+        'id': p.id,
+        'name': p.name,
+        'description': p.description,
+        'price': float(p.price),
+        'photo_path': p.photo_path,
+        'photo_thumb': variants['thumb'] if variants else p.photo_path,
+        'photo_srcset': photo_srcset(p.photo_path)
+    }
+
+def _build_snapshot(version):
+    products = Product.select().where(Product.is_active == True)
+    body = json.dumps(
+        {'success': True, 'products': [serialize_product(p) for p in products]},
+        ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+    etag = hashlib.sha1(body).hexdigest()[:20]
+    last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+    return CatalogSnapshot(version, body, etag, last_modified)
+
+def get_catalog():
+    global _snapshot
+    version = catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version:
+            previous = snapshot
+            snapshot = _build_snapshot(version)
+            if previous is not None and previous.etag == snapshot.etag:
+                snapshot = snapshot._replace(last_modified=previous.last_modified)
+            _snapshot = snapshot
+    return snapshot
@@ -0,0 +1,64 @@
+from web.models import Order, OrderItem, Product, database_proxy
+from .stats import record_order_sales
+
+class CheckoutError(Exception):
+    pass
+
+def _parse_cart(cart_items):
+    lines = []
+    for item in cart_items:
+        try:
+            product_id = int(item['product_id'])
+            quantity = int(item['quantity'])
+        except (KeyError, TypeError, ValueError):
+            raise CheckoutError('Invalid cart item')
+        if quantity <= 0:
+            raise CheckoutError('Invalid quantity')
+        lines.append((product_id, quantity))
+    return lines
+
+def place_order(first_name, last_name, phone, username, comment, cart_items, user=None):
+    lines = _parse_cart(cart_items)
+
+    with database_proxy.atomic('IMMEDIATE'):
+        product_ids = {product_id for product_id, _ in lines}
+        products = {
+            p.id: p for p in
+            Product.select(Product.id, Product.name, Product.price, Product.is_active)
+            .where(Product.id.in_(list(product_ids)))
+        }
+
+        missing = product_ids - products.keys()
+        if missing:
+            raise CheckoutError(f"Product not found: {', '.join(map(str, sorted(missing)))}")
+        inactive = [p.name for p in products.values() if not p.is_active]
+        if inactive:
+            raise CheckoutError(f"Product unavailable: {', '.join(inactive)}")
+
+        order_items_data = []
+        total_amount = 0
+        for product_id, quantity in lines:
+            product = products[product_id]
+            total_amount += product.price * quantity
+            order_items_data.append({
+                'product': product.id,
+                'product_name': product.name,
+                'quantity': quantity,
+                'price': product.price
+            })
+
+        order = Order.create(
+            user=user,
+            first_name=first_name,
+            last_name=last_name,
+            phone=phone,
+            username=username if username else None,
+            total_amount=total_amount,
+            comment=comment
+        )
+        OrderItem.insert_many(
+            [dict(item, order=order.id) for item in order_items_data]
+        ).execute()
+        record_order_sales(order, order_items_data)
+
+    return order, order_items_data
@@ -0,0 +1,50 @@
+import time
+from typing import Optional
+from aiogram.utils.web_app import safe_parse_webapp_init_data
+from web.models import Order, User
+from config import config
+
+class WebAppAuthError(Exception):
+    pass
+
+def register_user(telegram_id: int, username: Optional[str] = None) -> User:
+    user, created = User.get_or_create(telegram_id=telegram_id, defaults={'username': username})
+    if not created and username and user.username != username:
+        user.username = username
+        user.save(only=[User.username])
+    # Orders placed from the reply-keyboard WebApp carry no init data, so they
+    # arrive unlinked; pick them up on every visit, not just the first.
+    if username:
+        link_orders(user)
+    return user
+
+def link_orders(user: User) -> int:
+    return (Order
+            .update(user=user.id)
+            .where((Order.username == user.username) & Order.user.is_null())
+            .execute())
+
+def backfill_order_users() -> int:
+    owner = (User
+             .select(User.id)
+             .where(User.username == Order.username)
+             .order_by(User.id)
+             .limit(1))
+    return (Order
+            .update(user=owner)
+            .where(Order.user.is_null() &
+                   Order.username.in_(User.select(User.username).where(User.username.is_null(False))))
+            .execute())
+
+def webapp_user(init_data: Optional[str]) -> Optional[User]:
+    if not init_data:
+        return None
+    try:
+        data = safe_parse_webapp_init_data(config.BOT_TOKEN, init_data)
+    except ValueError as e:
+        raise WebAppAuthError(str(e))
+    if time.time() - data.auth_date.timestamp() > config.WEBAPP_INIT_DATA_TTL:
+        raise WebAppAuthError('Init data expired')
+    if data.user is None:
+        raise WebAppAuthError('Init data has no user')
+    return register_user(data.user.id, data.user.username)
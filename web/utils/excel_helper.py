@@ -1,62 +1,125 @@
-from openpyxl import Workbook, load_workbook
+import hashlib
+import os
+import tempfile
+import threading
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
+from peewee import fn
+from web.models import Order, OrderItem
 from config import config
 
-def initialize_excel():
-    if not config.EXCEL_PATH.exists():
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Заказы"
-        
-        headers = ['Дата', 'Имя', 'Фамилия', 'Телефон', 'Username']
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col)
-            cell.value = header
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.alignment = Alignment(horizontal='center')
-            cell.fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-        
-        wb.save(config.EXCEL_PATH)
-
-def add_order_to_excel(order_data):
-    initialize_excel()
-    wb = load_workbook(config.EXCEL_PATH)
-    ws = wb.active
-    
-    next_row = ws.max_row + 1
-    
-    ws.cell(row=next_row, column=1, value=order_data['date'])
-    ws.cell(row=next_row, column=2, value=order_data['first_name'])
-    ws.cell(row=next_row, column=3, value=order_data['last_name'])
-    ws.cell(row=next_row, column=4, value=order_data['phone'])
-    ws.cell(row=next_row, column=5, value=order_data.get('username', ''))
-    
-    col = 6
-    for item in order_data['items']:
-        cell = ws.cell(row=next_row, column=col)
-        cell.value = item['product_name']
-        if next_row == 2:
-            header = ws.cell(row=1, column=col)
-            header.value = 'Название товара'
-            header.font = Font(bold=True, color="FFFFFF")
-            header.alignment = Alignment(horizontal='center')
-            header.fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-        
-        col += 1
-        
-        cell = ws.cell(row=next_row, column=col)
-        cell.value = f"{item['quantity']} шт"
-        if next_row == 2:
-            header = ws.cell(row=1, column=col)
-            header.value = 'Количество товара'
-            header.font = Font(bold=True, color="FFFFFF")
-            header.alignment = Alignment(horizontal='center')
-            header.fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-        
-        col += 1
-    
-    wb.save(config.EXCEL_PATH)
-
-def get_excel_file():
-    initialize_excel()
-    return config.EXCEL_PATH
+_build_lock = threading.Lock()
+
+def _header_cell(ws, value):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = Font(bold=True, color="FFFFFF")
+    cell.alignment = Alignment(horizontal='center')
+    cell.fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+    return cell
+
+def _filter_orders(query, date_from=None, date_to=None, status=None):
+    if date_from:
+        query = query.where(Order.created_at >= date_from)
+    if date_to:
+        query = query.where(Order.created_at < date_to)
+    if status:
+        query = query.where(Order.status == status)
+    return query
+
+def _max_items_per_order(date_from=None, date_to=None, status=None):
+    counts = _filter_orders(
+        OrderItem.select(fn.COUNT(OrderItem.id).alias('cnt')).join(Order),
+        date_from, date_to, status
+    ).group_by(OrderItem.order)
+    return OrderItem.select(fn.MAX(counts.c.cnt)).from_(counts).scalar() or 0
+
+def _iter_order_rows(date_from=None, date_to=None, status=None):
+    query = _filter_orders(
+        Order.select(Order.id, Order.created_at, Order.first_name, Order.last_name,
+                     Order.phone, Order.username),
+        date_from, date_to, status
+    )
+    last_id = 0
+
+    while True:
+        chunk = list(
+            query.where(Order.id > last_id)
+            .order_by(Order.id)
+            .limit(config.EXPORT_CHUNK_SIZE)
+            .tuples()
+        )
+        if not chunk:
+            break
+
+        items = {}
+        item_rows = (OrderItem
+                     .select(OrderItem.order, OrderItem.product_name, OrderItem.quantity)
+                     .where(OrderItem.order.in_([row[0] for row in chunk]))
+                     .order_by(OrderItem.id)
+                     .tuples())
+        for order_id, product_name, quantity in item_rows:
+            items.setdefault(order_id, []).append((product_name, quantity))
+
+        for order_id, created_at, first_name, last_name, phone, username in chunk:
+            row = [
+                created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                first_name,
+                last_name,
+                phone,
+                username or ''
+            ]
+            for product_name, quantity in items.get(order_id, []):
+                row.append(product_name)
+                row.append(f"{quantity} шт")
+            yield row
+
+        last_id = chunk[-1][0]
+
+def build_excel(path, date_from=None, date_to=None, status=None):
+    max_items = _max_items_per_order(date_from, date_to, status)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Заказы")
+
+    headers = ['Дата', 'Имя', 'Фамилия', 'Телефон', 'Username']
+    headers += ['Название товара', 'Количество товара'] * max_items
+    ws.append([_header_cell(ws, header) for header in headers])
+
+    for row in _iter_order_rows(date_from, date_to, status):
+        ws.append(row)
+
+    # Every gunicorn worker builds into the same cache directory, so the
+    # temporary name must be unique per build, not derived from the target.
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f'{path.stem}.', suffix='.tmp',
+                                     delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        wb.save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _prune_cache(keep):
+    files = sorted(config.EXPORT_CACHE_PATH.glob('orders_*.xlsx'),
+                   key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in files[keep:]:
+        path.unlink(missing_ok=True)
+
+def get_excel_file(date_from=None, date_to=None, status=None):
+    max_order_id = Order.select(fn.MAX(Order.id)).scalar() or 0
+    filters = f"{date_from}|{date_to}|{status}"
+    filters_key = hashlib.sha1(filters.encode()).hexdigest()[:12]
+    path = config.EXPORT_CACHE_PATH / f"orders_{filters_key}_{max_order_id}.xlsx"
+
+    # The lock is per process: a worker may prune this file before the caller
+    # opens it, so senders retry on FileNotFoundError, which rebuilds it.
+    with _build_lock:
+        if not path.exists():
+            config.EXPORT_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+            for stale in config.EXPORT_CACHE_PATH.glob(f"orders_{filters_key}_*.xlsx"):
+                stale.unlink(missing_ok=True)
+            build_excel(path, date_from, date_to, status)
+            _prune_cache(config.EXPORT_CACHE_MAX_FILES)
+    return path
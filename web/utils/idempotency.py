@@ -0,0 +1,52 @@
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from web.models import IdempotencyKey
+from config import config
+
+KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+class IdempotencyConflict(Exception):
+    pass
+
+class StoredResponse(NamedTuple):
+    status: int
+    body: dict
+
+_last_purge = 0.0
+
+def is_valid_key(key: str) -> bool:
+    return KEY_PATTERN.match(key) is not None
+
+def request_fingerprint(payload) -> str:
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def lookup_response(key: str, fingerprint: str) -> Optional[StoredResponse]:
+    expires_before = datetime.now() - timedelta(seconds=config.IDEMPOTENCY_TTL)
+    record = IdempotencyKey.get_or_none(
+        (IdempotencyKey.key == key) & (IdempotencyKey.created_at >= expires_before)
+    )
+    if record is None:
+        return None
+    if record.fingerprint != fingerprint:
+        raise IdempotencyConflict('Idempotency key was already used for a different request')
+    return StoredResponse(record.status, json.loads(record.body))
+
+def store_response(key: str, fingerprint: str, status: int, body: dict):
+    global _last_purge
+    IdempotencyKey.insert(
+        key=key,
+        fingerprint=fingerprint,
+        status=status,
+        body=json.dumps(body, ensure_ascii=False),
+        created_at=datetime.now()
+    ).on_conflict_replace().execute()
+
+    if time.monotonic() - _last_purge > config.IDEMPOTENCY_TTL / 24:
+        _last_purge = time.monotonic()
+        expires_before = datetime.now() - timedelta(seconds=config.IDEMPOTENCY_TTL)
+        IdempotencyKey.delete().where(IdempotencyKey.created_at < expires_before).execute()
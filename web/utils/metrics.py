@@ -0,0 +1,214 @@
+import bisect
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, Optional, Tuple
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from config import config
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+FAMILIES = {
+    'bot_handler_seconds': ('Bot handler latency', TIME_BUCKETS),
+    'bot_handler_db_queries': ('SQL queries per bot update', COUNT_BUCKETS),
+    'bot_handler_db_seconds': ('Database time per bot update', TIME_BUCKETS),
+    'http_request_seconds': ('HTTP request latency', TIME_BUCKETS),
+    'http_request_db_queries': ('SQL queries per HTTP request', COUNT_BUCKETS),
+    'http_request_db_seconds': ('Database time per HTTP request', TIME_BUCKETS),
+    'telegram_api_seconds': ('Telegram Bot API call latency', TIME_BUCKETS),
+    'db_query_seconds': ('SQL statement latency', TIME_BUCKETS),
+}
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'Histogram'):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the quantile; good enough to rank
+        # hot paths, not a precise percentile.
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {'counts': self.counts, 'count': self.count, 'total': self.total, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, buckets, data: dict) -> 'Histogram':
+        histogram = cls(buckets)
+        histogram.counts = list(data['counts'])
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.max = data['max']
+        return histogram
+
+class QueryStats:
+    __slots__ = ('queries', 'seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+def begin_queries() -> Tuple[QueryStats, Token]:
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+def end_queries(token: Token):
+    _query_stats.reset(token)
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats, token = begin_queries()
+    try:
+        yield stats
+    finally:
+        end_queries(token)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[tuple, Histogram] = {}
+        self.role = 'app'
+        self._flushed_at = 0.0
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(FAMILIES[name][1])
+            histogram.observe(value)
+
+    def record_query(self, elapsed: float):
+        self.observe('db_query_seconds', elapsed)
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[name, list(labels), histogram.to_dict()]
+                    for (name, labels), histogram in self._histograms.items()]
+
+    @property
+    def process(self) -> str:
+        return f"{self.role}-{os.getpid()}"
+
+    def flush(self):
+        path = config.METRICS_PATH / f'{self.process}.json'
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            config.METRICS_PATH.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(self.snapshot()))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot: {e}")
+        self._flushed_at = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._flushed_at > config.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def collect(self) -> Dict[str, list]:
+        """Live series of this process plus recent snapshots of the others, by process."""
+        processes = {self.process: self.snapshot()}
+        expires_before = time.time() - config.METRICS_FLUSH_INTERVAL * 4
+        for path in config.METRICS_PATH.glob('*.json'):
+            if path.stem in processes:
+                continue
+            try:
+                if path.stat().st_mtime < expires_before:
+                    path.unlink(missing_ok=True)
+                    continue
+                processes[path.stem] = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+
+        series = {}
+        for process, entries in processes.items():
+            for name, labels, data in entries:
+                if name not in FAMILIES:
+                    continue
+                labels = tuple(tuple(label) for label in labels) + (('process', process),)
+                series.setdefault(name, []).append((labels, Histogram.from_dict(FAMILIES[name][1], data)))
+        return series
+
+metrics = MetricsRegistry()
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs) -> str:
+    return ','.join(f'{key}="{_label_value(value)}"' for key, value in pairs)
+
+def render_prometheus() -> str:
+    lines = []
+    for name, series in sorted(metrics.collect().items()):
+        description, buckets = FAMILIES[name]
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, count in zip(buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{_labels(labels + (("le", bound),))}}} {cumulative}')
+            lines.append(f'{name}_bucket{{{_labels(labels + (("le", "+Inf"),))}}} {histogram.count}')
+            lines.append(f'{name}_sum{{{_labels(labels)}}} {histogram.total}')
+            lines.append(f'{name}_count{{{_labels(labels)}}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+def summarize(name: str, label: str, series: Optional[Dict[str, list]] = None) -> Dict[str, Histogram]:
+    """Series of one family merged across processes, keyed by a single label."""
+    if series is None:
+        series = metrics.collect()
+    merged = {}
+    for labels, histogram in series.get(name, []):
+        key = dict(labels).get(label, '')
+        if key in merged:
+            merged[key].merge(histogram)
+        else:
+            merged[key] = histogram
+    return merged
+
+class TelegramApiTiming(BaseRequestMiddleware):
+    async def __call__(self, make_request, bot, method):
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            metrics.observe('telegram_api_seconds', time.perf_counter() - started,
+                            method=type(method).__name__)
@@ -0,0 +1,123 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from aiogram import Bot
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError
+from web.models import User
+from .metrics import TelegramApiTiming
+from .send_scheduler import BULK, SendScheduler, priority
+from config import config
+
+logger = logging.getLogger(__name__)
+
+class NotificationDispatcher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._admin_ids = []
+        self._admin_ids_loaded_at = 0.0
+
+    def _start(self):
+        ready = threading.Event()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name='notifications', daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._start()
+
+    def notify_admins(self, text: str):
+        if not config.BOT_TOKEN:
+            return
+        self._ensure_started()
+        self._loop.call_soon_threadsafe(self._enqueue, text)
+
+    def _enqueue(self, text):
+        try:
+            self._queue.put_nowait(text)
+        except asyncio.QueueFull:
+            logger.warning("Notification queue is full, dropping admin notification")
+
+    def stop(self, timeout: float = 10):
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                return
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+            self._thread.join(timeout)
+
+    def _run(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(maxsize=config.NOTIFY_QUEUE_SIZE)
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._worker())
+        finally:
+            self._loop.close()
+
+    async def _worker(self):
+        bot = Bot(token=config.BOT_TOKEN)
+        scheduler = SendScheduler()
+        bot.session.middleware(scheduler)
+        bot.session.middleware(TelegramApiTiming())
+        semaphore = asyncio.Semaphore(config.NOTIFY_CONCURRENCY)
+        pending = set()
+        try:
+            while True:
+                text = await self._queue.get()
+                if text is None:
+                    break
+                admin_ids = await self._get_admin_ids()
+                for chat_id in admin_ids:
+                    task = asyncio.create_task(self._send(bot, chat_id, text, semaphore))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            await scheduler.close()
+            await bot.session.close()
+
+    async def _get_admin_ids(self):
+        if time.monotonic() - self._admin_ids_loaded_at > config.NOTIFY_ADMIN_CACHE_TTL:
+            try:
+                self._admin_ids = await asyncio.to_thread(self._load_admin_ids)
+                self._admin_ids_loaded_at = time.monotonic()
+            except Exception as e:
+                logger.error(f"Failed to load admins: {e}")
+        return self._admin_ids
+
+    @staticmethod
+    def _load_admin_ids():
+        query = User.select(User.telegram_id).where(User.is_admin == True)
+        return [telegram_id for telegram_id, in query.tuples()]
+
+    async def _send(self, bot, chat_id, text, semaphore):
+        # Pacing and retry_after are handled by the scheduler; admin alerts
+        # go out as bulk traffic so they never delay replies to buyers.
+        async with semaphore:
+            for attempt in range(1, config.NOTIFY_RETRIES + 1):
+                try:
+                    with priority(BULK):
+                        await bot.send_message(chat_id, text)
+                    return
+                except (TelegramNetworkError, TelegramServerError) as e:
+                    if attempt == config.NOTIFY_RETRIES:
+                        logger.error(f"Failed to notify admin {chat_id}: {e}")
+                        return
+                    await asyncio.sleep(2 ** attempt)
+                except Exception as e:
+                    logger.error(f"Failed to notify admin {chat_id}: {e}")
+                    return
+
+notifier = NotificationDispatcher()
+atexit.register(notifier.stop)
@@ -0,0 +1,48 @@
+from decimal import Decimal
+from typing import List, NamedTuple, Optional
+from peewee import JOIN, fn
+from web.models import Order, OrderItem, User
+
+CENTS = Decimal('0.01')
+
+class OrderDetails(NamedTuple):
+    order: Order
+    items: List[OrderItem]
+
+class ClientSummary(NamedTuple):
+    orders_count: int
+    revenue: Decimal
+    orders: List[Order]
+
+def get_order_details(order_id: int, telegram_id: Optional[int] = None) -> Optional[OrderDetails]:
+    query = (Order
+             .select(Order, OrderItem)
+             .join(OrderItem, JOIN.LEFT_OUTER, on=(OrderItem.order == Order.id), attr='line')
+             .where(Order.id == order_id)
+             .order_by(OrderItem.id))
+    if telegram_id is not None:
+        query = query.switch(Order).join(User).where(User.telegram_id == telegram_id)
+
+    order = None
+    items = []
+    for row in query:
+        order = order or row
+        line = getattr(row, 'line', None)
+        if line is not None:
+            items.append(line)
+    if order is None:
+        return None
+    return OrderDetails(order, items)
+
+def get_client_summary(username: str) -> ClientSummary:
+    query = (Order
+             .select(Order.id, Order.total_amount,
+                     fn.COUNT(Order.id).over().alias('orders_count'),
+                     fn.SUM(Order.total_amount).over().alias('revenue'))
+             .where(Order.username == username)
+             .order_by(Order.id))
+    orders = list(query)
+    if not orders:
+        return ClientSummary(0, Decimal(0), [])
+    revenue = Decimal(str(orders[0].revenue)).quantize(CENTS)
+    return ClientSummary(orders[0].orders_count, revenue, orders)
@@ -0,0 +1,74 @@
+import hashlib
+import io
+import os
+import re
+from pathlib import Path
+from PIL import Image, ImageOps
+from web.models import Product
+from config import config
+
+PHOTOS_URL = '/static/assets/photos'
+ORIGINAL_SIZE = 1280
+ORIGINAL_QUALITY = 85
+VARIANTS = (('thumb', 160), ('card', 480), ('large', 1280))
+VARIANT_QUALITY = 80
+
+CONTENT_ADDRESSED = re.compile(r'^[0-9a-f]{32}\.jpg$')
+
+def _save_atomic(image, path, **params):
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    image.save(tmp_path, **params)
+    os.replace(tmp_path, path)
+
+def _fit(image, size):
+    image = image.copy()
+    image.thumbnail((size, size), Image.LANCZOS)
+    return image
+
+def store_photo(data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    original = config.PHOTOS_PATH / f'{digest}.jpg'
+    variants = [(config.PHOTOS_PATH / f'{digest}_{name}.webp', size) for name, size in VARIANTS]
+
+    if not original.exists() or not all(path.exists() for path, _ in variants):
+        config.PHOTOS_PATH.mkdir(parents=True, exist_ok=True)
+        with Image.open(io.BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+            for path, size in variants:
+                _save_atomic(_fit(image, size), path, format='WEBP', quality=VARIANT_QUALITY, method=4)
+            _save_atomic(_fit(image, ORIGINAL_SIZE).convert('RGB'), original,
+                         format='JPEG', quality=ORIGINAL_QUALITY, optimize=True, progressive=True)
+
+    return f'{PHOTOS_URL}/{original.name}'
+
+def photo_variants(photo_path):
+    if not photo_path:
+        return None
+    name = Path(photo_path).name
+    if not CONTENT_ADDRESSED.match(name):
+        return None
+    digest = name[:-len('.jpg')]
+    return {variant: f'{PHOTOS_URL}/{digest}_{variant}.webp' for variant, _ in VARIANTS}
+
+def photo_srcset(photo_path):
+    variants = photo_variants(photo_path)
+    if variants is None:
+        return None
+    return ', '.join(f'{variants[name]} {size}w' for name, size in VARIANTS)
+
+def release_photo(photo_path, exclude_product_id=None):
+    if not photo_path:
+        return
+    query = Product.select().where(Product.photo_path == photo_path)
+    if exclude_product_id is not None:
+        query = query.where(Product.id != exclude_product_id)
+    if query.exists():
+        return
+
+    name = Path(photo_path).name
+    (config.PHOTOS_PATH / name).unlink(missing_ok=True)
+    for url in (photo_variants(photo_path) or {}).values():
+        (config.PHOTOS_PATH / Path(url).name).unlink(missing_ok=True)
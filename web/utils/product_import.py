@@ -0,0 +1,159 @@
+import csv
+import threading
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import List, NamedTuple
+import openpyxl
+from peewee import fn
+from web.models import Product, database_proxy
+from .catalog import invalidate_catalog
+from config import config
+
+MAX_REPORTED_ERRORS = 5
+
+class ImportResult(NamedTuple):
+    processed: int
+    added: int
+    updated: int
+    skipped: int
+    errors: List[str]
+
+class ImportProgress:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.added = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors = []
+
+    def skip(self, idx, reason):
+        with self._lock:
+            self.skipped += 1
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                self.errors.append(f"Строка {idx}: {reason}")
+
+    def advance(self, processed, added, updated):
+        with self._lock:
+            self.processed += processed
+            self.added += added
+            self.updated += updated
+
+    def snapshot(self) -> ImportResult:
+        with self._lock:
+            return ImportResult(self.processed, self.added, self.updated, self.skipped, list(self.errors))
+
+def _iter_xlsx(filepath):
+    wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(min_row=1, values_only=True)
+    finally:
+        wb.close()
+
+def _iter_csv(filepath):
+    with open(filepath, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+def iter_rows(filepath):
+    if Path(filepath).suffix.lower() == '.csv':
+        return _iter_csv(filepath)
+    return _iter_xlsx(filepath)
+
+def _parse_row(row):
+    if len(row) < 3:
+        raise ValueError("недостаточно колонок")
+
+    name = str(row[0]).strip()
+    description = str(row[1]).strip() if row[1] else ''
+    try:
+        price = Decimal(str(row[2]).strip().replace(' ', '').replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError("неверная цена")
+
+    if len(name) > config.MAX_NAME_LENGTH:
+        raise ValueError("название слишком длинное")
+    if len(description) > config.MAX_DESCRIPTION_LENGTH:
+        raise ValueError("описание слишком длинное")
+    if not price.is_finite() or price < config.MIN_PRICE or price > config.MAX_PRICE:
+        raise ValueError("цена вне диапазона")
+
+    return name, description, price.quantize(Decimal('0.01'))
+
+INSERT_SQL = (
+    'INSERT INTO "products" ("name", "description", "price", "is_active", "created_at") '
+    'VALUES (?, ?, ?, 1, ?)'
+)
+UPDATE_SQL = 'UPDATE "products" SET "description" = ?, "price" = ?, "is_active" = 1 WHERE "id" = ?'
+
+def _write_chunk(chunk):
+    created_at = Product.created_at.db_value(datetime.now())
+    with database_proxy.atomic('IMMEDIATE'):
+        existing = {
+            row.name: row.id for row in
+            Product.select(Product.name, fn.MIN(Product.id).alias('id'))
+            .where(Product.name.in_(list(chunk)))
+            .group_by(Product.name)
+        }
+
+        updates = [
+            (description, str(price), existing[name])
+            for name, (description, price) in chunk.items() if name in existing
+        ]
+        inserts = [
+            (name, description, str(price), created_at)
+            for name, (description, price) in chunk.items() if name not in existing
+        ]
+
+        cursor = database_proxy.cursor()
+        if updates:
+            cursor.executemany(UPDATE_SQL, updates)
+        if inserts:
+            cursor.executemany(INSERT_SQL, inserts)
+
+    return len(inserts), len(updates)
+
+def import_products(filepath, progress: ImportProgress = None, chunk_size: int = None) -> ImportResult:
+    progress = progress or ImportProgress()
+    chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+    changed = False
+
+    with database_proxy.connection_context():
+        chunk = {}
+        rows = 0
+        for idx, row in enumerate(iter_rows(filepath), start=1):
+            if not row or not row[0]:
+                continue
+
+            rows += 1
+            try:
+                name, description, price = _parse_row(row)
+            except ValueError as e:
+                progress.skip(idx, e)
+                continue
+
+            chunk[name] = (description, price)
+            if len(chunk) >= chunk_size:
+                added, updated = _write_chunk(chunk)
+                progress.advance(rows, added, updated)
+                changed = True
+                chunk = {}
+                rows = 0
+
+        if chunk:
+            added, updated = _write_chunk(chunk)
+            changed = True
+        else:
+            added = updated = 0
+        progress.advance(rows, added, updated)
+
+    if changed:
+        invalidate_catalog()
+
+    return progress.snapshot()
@@ -0,0 +1,36 @@
+import re
+from typing import List
+from web.models import Product, ProductIndex
+from config import config
+
+TOKEN = re.compile(r'\w+')
+MAX_TERMS = 8
+
+def match_expression(query: str) -> str:
+    terms = TOKEN.findall(query.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_products(query: str, limit: int = None, offset: int = 0) -> List[Product]:
+    expression = match_expression(query)
+    if not expression:
+        return []
+
+    # bm25 scores every match, so broad prefixes ("т", "тов") are returned in
+    # catalog order; ordering must stay on the FTS rowid, otherwise SQLite
+    # drives the join from products and probes the index once per row.
+    matches = (ProductIndex
+               .select(ProductIndex.rowid)
+               .where(ProductIndex.match(expression))
+               .limit(config.SEARCH_RANK_LIMIT + 1)
+               .count())
+    order = [ProductIndex.rowid]
+    if matches <= config.SEARCH_RANK_LIMIT:
+        order.insert(0, ProductIndex.rank())
+
+    return list(Product
+                .select()
+                .join(ProductIndex, on=(ProductIndex.rowid == Product.id))
+                .where(ProductIndex.match(expression) & (Product.is_active == True))
+                .order_by(*order)
+                .limit(limit or config.SEARCH_LIMIT)
+                .offset(offset))
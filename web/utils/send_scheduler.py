@@ -0,0 +1,148 @@
+import asyncio
+import bisect
+import contextlib
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+from config import config
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BULK = 1
+
+send_priority: ContextVar[int] = ContextVar('send_priority', default=INTERACTIVE)
+
+SCHEDULED_PREFIXES = ('Send', 'Edit', 'Copy', 'Forward')
+
+@contextlib.contextmanager
+def priority(level: int):
+    token = send_priority.set(level)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+class SendScheduler(BaseRequestMiddleware):
+    def __init__(self, rate: float = None, chat_rate: float = None, chat_burst: int = None,
+                 retries: int = None, max_chats: int = 10000):
+        self.chat_rate = chat_rate or config.SEND_CHAT_RATE
+        self.chat_burst = chat_burst or config.SEND_CHAT_BURST
+        self.retries = retries or config.SEND_RETRIES
+        self.max_chats = max_chats
+        global_rate = rate or config.SEND_GLOBAL_RATE
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats = OrderedDict()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._changed = None
+        self._pump_task = None
+
+    async def __call__(self, make_request, bot, method):
+        if not type(method).__name__.startswith(SCHEDULED_PREFIXES):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, 'chat_id', None)
+        level = send_priority.get()
+        for attempt in range(1, self.retries + 1):
+            await self._acquire(chat_id, level)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                logger.warning(f"Flood limit for chat {chat_id}, retrying in {e.retry_after}s")
+                if chat_id is not None:
+                    self._chat(chat_id).pause(e.retry_after)
+                else:
+                    self._global.pause(e.retry_after)
+                if attempt == self.retries:
+                    raise
+
+    async def close(self):
+        if self._pump_task is not None and not self._pump_task.done():
+            self._pump_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._pump_task
+
+    def _chat(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def _acquire(self, chat_id, level):
+        loop = asyncio.get_running_loop()
+        if self._pump_task is None or self._pump_task.done() or self._pump_task.get_loop() is not loop:
+            self._changed = asyncio.Event()
+            self._pump_task = loop.create_task(self._pump())
+
+        granted = loop.create_future()
+        bisect.insort(self._waiters, (level, next(self._sequence), chat_id, granted))
+        self._changed.set()
+        await granted
+
+    async def _pump(self):
+        # Grants go out in priority order, but a chat that is still cooling
+        # down never holds back waiters for other chats.
+        while True:
+            self._changed.clear()
+            now = time.monotonic()
+            wait = self._global.delay(now)
+            if wait <= 0:
+                wait = None
+                for index, (_, _, chat_id, granted) in enumerate(self._waiters):
+                    if granted.done():
+                        continue
+                    chat = self._chat(chat_id) if chat_id is not None else None
+                    chat_wait = chat.delay(now) if chat is not None else 0.0
+                    if chat_wait <= 0:
+                        if chat is not None:
+                            chat.take()
+                        self._global.take()
+                        granted.set_result(None)
+                        del self._waiters[index]
+                        break
+                    wait = chat_wait if wait is None else min(wait, chat_wait)
+                else:
+                    self._waiters = [w for w in self._waiters if not w[3].done()]
+                    if wait is None:
+                        await self._changed.wait()
+                    else:
+                        with contextlib.suppress(asyncio.TimeoutError):
+                            await asyncio.wait_for(self._changed.wait(), wait)
+                continue
+            await asyncio.sleep(wait)
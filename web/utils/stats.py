@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from peewee import EXCLUDED, fn
+from web.models import DailySales, Order, OrderItem, Product, ProductSales, database_proxy
+
+def record_order_sales(order, order_items_data):
+    day = order.created_at.date()
+    DailySales.insert(
+        day=day, orders_count=1, revenue=order.total_amount
+    ).on_conflict(
+        conflict_target=[DailySales.day],
+        update={
+            DailySales.orders_count: DailySales.orders_count + 1,
+            DailySales.revenue: DailySales.revenue + EXCLUDED.revenue
+        }
+    ).execute()
+
+    per_product = {}
+    for item in order_items_data:
+        row = per_product.setdefault(item['product'], {
+            'product_id': item['product'],
+            'product_name': item['product_name'],
+            'quantity': 0,
+            'revenue': Decimal(0)
+        })
+        row['quantity'] += item['quantity']
+        row['revenue'] += Decimal(item['price']) * item['quantity']
+
+    ProductSales.insert_many(list(per_product.values())).on_conflict(
+        conflict_target=[ProductSales.product_id],
+        update={
+            ProductSales.product_name: EXCLUDED.product_name,
+            ProductSales.quantity: ProductSales.quantity + EXCLUDED.quantity,
+            ProductSales.revenue: ProductSales.revenue + EXCLUDED.revenue
+        }
+    ).execute()
+
+def rebuild_sales_summary():
+    day = fn.date(Order.created_at)
+    with database_proxy.atomic('IMMEDIATE'):
+        DailySales.delete().execute()
+        ProductSales.delete().execute()
+        DailySales.insert_from(
+            Order.select(day, fn.COUNT(Order.id), fn.SUM(Order.total_amount)).group_by(day),
+            [DailySales.day, DailySales.orders_count, DailySales.revenue]
+        ).execute()
+        ProductSales.insert_from(
+            OrderItem.select(
+                OrderItem.product,
+                fn.MAX(OrderItem.product_name),
+                fn.SUM(OrderItem.quantity),
+                fn.SUM(OrderItem.price * OrderItem.quantity)
+            ).group_by(OrderItem.product),
+            [ProductSales.product_id, ProductSales.product_name,
+             ProductSales.quantity, ProductSales.revenue]
+        ).execute()
+
+def get_sales_stats(days=7, weeks=4, top_products=5):
+    today = date.today()
+    totals = DailySales.select(
+        fn.COALESCE(fn.SUM(DailySales.orders_count), 0),
+        fn.COALESCE(fn.SUM(DailySales.revenue), 0)
+    ).tuples().get()
+
+    by_day = list(
+        DailySales.select(DailySales.day, DailySales.orders_count, DailySales.revenue)
+        .where(DailySales.day > today - timedelta(days=days))
+        .order_by(DailySales.day.desc())
+        .tuples()
+    )
+
+    # Monday of the day's week: strftime('%Y-%W') would split the week that
+    # straddles New Year into two groups.
+    week = fn.date(DailySales.day, 'weekday 0', '-6 days')
+    this_monday = today - timedelta(days=today.weekday())
+    by_week = list(
+        DailySales.select(
+            week.python_value(DailySales.day.python_value),
+            fn.SUM(DailySales.orders_count),
+            fn.SUM(DailySales.revenue)
+        )
+        .where(DailySales.day >= this_monday - timedelta(weeks=weeks - 1))
+        .group_by(week)
+        .order_by(week.desc())
+        .tuples()
+    )
+
+    by_product = list(
+        ProductSales.select(ProductSales.product_name, ProductSales.quantity, ProductSales.revenue)
+        .order_by(ProductSales.revenue.desc())
+        .limit(top_products)
+        .tuples()
+    )
+
+    return {
+        'products': Product.select().where(Product.is_active == True).count(),
+        'orders': totals[0],
+        'revenue': float(totals[1]),
+        'by_day': by_day,
+        'by_week': by_week,
+        'by_product': by_product
+    }